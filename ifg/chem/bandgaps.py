@@ -0,0 +1,86 @@
+"""Bandgap bin counting of functional group data for the quantitative structure-property analysis"""
+
+import math
+from typing import Sequence
+
+import numpy
+import pandas
+
+
+def bandgapBins(max_bandgap: float, bin_width: float) -> "list[float]":
+    """The lower edges of the bandgap bins of width ``bin_width``, which start at 0 eV and span up to the next whole eV above the largest bandgap.
+
+        When the largest bandgap is itself a whole number of eV, one more bin is added so the largest bandgap falls inside the last bin.
+
+        Parameters
+        ----------
+        max_bandgap : float
+            The largest bandgap of the dataset in eV
+
+        bin_width : float
+            The width of each bandgap bin in eV
+
+        Returns
+        -------
+        list[float]
+            The lower edge of each bandgap bin in eV
+    """
+    assert bin_width > 0
+
+    bin_count: int = math.ceil(math.ceil(max_bandgap)/bin_width)
+    if bin_count*bin_width <= max_bandgap:
+        bin_count += 1
+    return [x*bin_width for x in range(0, bin_count)]
+
+
+def bandgapBinCounts(bandgaps: "pandas.Series", present: pandas.DataFrame, bandgap_bins: "Sequence[float]", bin_width: float) -> pandas.DataFrame:
+    """Counts the structures of each bandgap bin for which each column of ``present`` is true.
+
+        Each structure is placed in the bin whose lower edge is the largest one at or below its bandgap, so a bandgap exactly on a bin edge
+        counts towards the bin it starts. Structures below the first bin or at or above the upper edge of the last bin are in no bin and
+        are left out of every count. Every column is counted in one pass over the structures instead of one table filter per bin and column.
+
+        Parameters
+        ----------
+        bandgaps : pandas.Series
+            The bandgap of each structure in eV
+
+        present : pandas.DataFrame
+            A boolean table with one row per structure, in the order of ``bandgaps``, and one column per counted category
+
+        bandgap_bins : Sequence[float]
+            The lower edge of each bandgap bin in eV, see :py:func:`bandgapBins`
+
+        bin_width : float
+            The width of each bandgap bin in eV
+
+        Returns
+        -------
+        pandas.DataFrame
+            The number of structures with each column present, with one row per bandgap bin indexed by its lower edge and the columns of ``present``
+
+        Example
+        -------
+            >>> bandgap_bins = bandgapBins(max(bandgap_fg_data["bandgap"]), 0.5)
+            >>> bandgapBinCounts(bandgap_fg_data["bandgap"], bandgap_fg_data > 0, bandgap_bins, 0.5)
+
+        | `Algorithm Variables Reference`
+        | ``bandgap_bin_edges``  (numpy.ndarray):  the lower edge of each bandgap bin followed by the upper edge of the last bin
+        | ``positions``  (numpy.ndarray):  the bin position of each structure, -1 or ``len(bandgap_bins)`` when outside of every bin
+        | ``in_bins``  (numpy.ndarray):  whether each structure is inside a bin
+    """
+
+    ##### Bandgap Bin Position Of Each Structure #####
+    bandgap_bin_edges: numpy.ndarray = numpy.array([*bandgap_bins, len(bandgap_bins)*bin_width])
+    positions: numpy.ndarray = numpy.digitize(numpy.asarray(bandgaps, dtype=float), bandgap_bin_edges) - 1
+    in_bins: numpy.ndarray = (positions >= 0) & (positions < len(bandgap_bins))
+
+    ##### Per Bin Column Counts #####
+    return (
+        present.reset_index(drop=True)[in_bins]
+        .groupby(positions[in_bins])
+        .sum()
+        .reindex(range(len(bandgap_bins)), fill_value=0)
+        .astype(numpy.int64)
+        .set_axis(list(bandgap_bins), axis=0)
+    )
@@ -0,0 +1,382 @@
+"""Batch identification of the rings and functional groups of many organic molecules"""
+
+import multiprocessing
+import multiprocessing.pool
+import traceback
+from typing import Iterable, Literal, Sequence
+
+import numpy
+
+from .budget import BudgetExceeded
+from .counts import CountMatrix
+from .molecule import Molecule, MoleculeResult
+from .templates import loadFunctionalGroupLibrary
+
+
+class BatchResult():
+    """The ring, amino acid and functional group results of a batch of organic molecules in input order.
+
+        Every input structure has one row. The functional group counts of the batch are sparse count matrices over the
+        functional group columns of the template library (or of the requested functional groups), and the rows of failed
+        structures hold zero counts with their traceback in ``errors``.
+
+        Parameters
+        ----------
+        names : Sequence[str]
+            The name identifier of each structure
+
+        smiles : Sequence[str]
+            The SMILES code of each structure
+
+        aromatic_ring_counts : numpy.ndarray
+            The number of aromatic rings of each structure
+
+        non_aromatic_ring_counts : numpy.ndarray
+            The number of non aromatic rings of each structure
+
+        amino_acids : numpy.ndarray
+            The assertion of a present amino acid in each structure
+
+        functional_groups_all : CountMatrix
+            The functional group counts of each structure inclusive of overlapped functional groups
+
+        functional_groups_exact : CountMatrix
+            The functional group counts of each structure exclusive of overlapped functional groups
+
+        skipped_template_counts : numpy.ndarray
+            The number of functional group templates skipped by the atom and bond composition screen for each structure
+
+        errors : dict[int, str]
+            The traceback of each failed structure by row position (the exceeded budget message of a timed out structure)
+
+        profiles : list[dict | None] | None
+            The stage profile of each structure (None for a failed structure), see :py:meth:`profiling.StageProfile.asDict`, or None when the batch was not profiled
+
+        timeouts : dict[int, str] | None
+            The identification stage of each structure which exceeded its work budget by row position, see :py:class:`budget.BudgetExceeded`
+
+        Returns
+        -------
+        BatchResult
+            The results of the batch
+    """
+
+    __slots__ = (
+        "names",
+        "smiles",
+        "aromatic_ring_counts",
+        "non_aromatic_ring_counts",
+        "amino_acids",
+        "functional_groups_all",
+        "functional_groups_exact",
+        "skipped_template_counts",
+        "errors",
+        "profiles",
+        "timeouts",
+    )
+
+    def __init__(self,
+        names: "Sequence[str]",
+        smiles: "Sequence[str]",
+        aromatic_ring_counts: numpy.ndarray,
+        non_aromatic_ring_counts: numpy.ndarray,
+        amino_acids: numpy.ndarray,
+        functional_groups_all: CountMatrix,
+        functional_groups_exact: CountMatrix,
+        skipped_template_counts: numpy.ndarray,
+        errors: "dict[int, str]",
+        profiles: "list[dict | None] | None" = None,
+        timeouts: "dict[int, str] | None" = None,
+    ):
+        """Generates the results of a batch of organic molecules"""
+
+        self.names: "tuple[str, ...]" = tuple(names)
+        """The name identifier of each structure"""
+
+        self.smiles: "tuple[str, ...]" = tuple(smiles)
+        """The SMILES code of each structure"""
+
+        self.aromatic_ring_counts: numpy.ndarray = aromatic_ring_counts
+        """The number of aromatic rings of each structure"""
+
+        self.non_aromatic_ring_counts: numpy.ndarray = non_aromatic_ring_counts
+        """The number of non aromatic rings of each structure"""
+
+        self.amino_acids: numpy.ndarray = amino_acids
+        """The assertion of a present amino acid in each structure"""
+
+        self.functional_groups_all: CountMatrix = functional_groups_all
+        """The functional group counts of each structure inclusive of overlapped functional groups"""
+
+        self.functional_groups_exact: CountMatrix = functional_groups_exact
+        """The functional group counts of each structure exclusive of overlapped functional groups"""
+
+        self.skipped_template_counts: numpy.ndarray = skipped_template_counts
+        """The number of functional group templates skipped by the atom and bond composition screen for each structure"""
+
+        self.errors: "dict[int, str]" = errors
+        """The traceback of each failed structure by row position"""
+
+        self.profiles: "list[dict | None] | None" = profiles
+        """The stage profile of each structure, or None when the batch was not profiled"""
+
+        self.timeouts: "dict[int, str]" = timeouts or {}
+        """The identification stage of each timed out structure by row position, whose budget message is also in ``errors``"""
+
+    @property
+    def total_ring_counts(self) -> numpy.ndarray:
+        """The total number of rings of each structure"""
+        return self.aromatic_ring_counts + self.non_aromatic_ring_counts
+
+    def __len__(self) -> int:
+        """Number of structures in the batch"""
+        return len(self.names)
+
+    def result(self, i: int) -> "MoleculeResult | None":
+        """The result record of one structure by row position (None for a failed structure)"""
+        if i in self.errors:
+            return None
+        return MoleculeResult(
+            self.names[i],
+            int(self.aromatic_ring_counts[i]),
+            int(self.non_aromatic_ring_counts[i]),
+            bool(self.amino_acids[i]),
+            self.functional_groups_all.row(i),
+            self.functional_groups_exact.row(i),
+            int(self.skipped_template_counts[i]),
+            self.profiles[i] if self.profiles else None,
+        )
+
+
+##### Batch Worker Settings #####
+def _batchSettings(
+    groups: "Iterable[str] | None",
+    ring_perception: str,
+    matcher: str,
+    profile: bool,
+    max_steps: "int | None",
+    max_seconds: "float | None",
+) -> "dict[str, object]":
+    """Collects the Molecule keyword arguments every structure of a batch is identified with"""
+    return {
+        "groups": frozenset(groups) if groups is not None else None,
+        "ring_perception": ring_perception,
+        "matcher": matcher,
+        "profile": profile,
+        "max_steps": max_steps,
+        "max_seconds": max_seconds,
+    }
+
+
+_worker_settings: "dict[str, object]" = {}
+"""The Molecule keyword arguments of the batch being identified, set once per worker process"""
+
+
+def _initializeWorker(settings: "dict[str, object]"):
+    """Stores the batch Molecule settings and compiles the template library of a worker process once, before its first structure"""
+    _worker_settings.clear()
+    _worker_settings.update(settings)
+    library = loadFunctionalGroupLibrary()
+    if settings["groups"] is not None:
+        library.startTree(settings["groups"])
+
+
+def _identifyStructure(structure: "tuple[str, str]") -> "MoleculeResult | BudgetExceeded | str":
+    """Identifies one (smiles, name) structure into its result record, its exceeded work budget, or the traceback of the error raised while processing it"""
+    smiles, name = structure
+    try:
+        return Molecule(smiles, name=name, type="mol", **_worker_settings).result()
+    except BudgetExceeded as exceeded:
+        return exceeded
+    except BaseException:
+        return traceback.format_exc()
+
+
+def identifyMolecules(
+    structures: "Iterable[tuple[str, str]]",
+    groups: "Iterable[str] | None" = None,
+    workers: int = 1,
+    chunk_size: int = 16,
+    pool: "BatchPool | None" = None,
+    ring_perception: Literal["smiles", "graph"] = "smiles",
+    matcher: Literal["dfs", "vf2"] = "vf2",
+    profile: bool = False,
+    max_steps: "int | None" = None,
+    max_seconds: "float | None" = None,
+) -> BatchResult:
+    """Identifies the rings, amino acids and functional groups of a batch of organic molecules.
+
+        The template library and the start vertex discrimination tree of the requested functional groups are compiled
+        once per process instead of once per structure, and the structures are handed to the worker processes in chunks.
+        A structure which raises an error is recorded in :py:attr:`BatchResult.errors` without stopping the rest of the batch,
+        and a structure which exceeds its work budget (``max_steps`` or ``max_seconds``) is also recorded as timed out in
+        :py:attr:`BatchResult.timeouts` with its stage, so the time spent on a structure is bounded by its budget rather than by the structure.
+
+        Parameters
+        ----------
+        structures : Iterable[tuple[str, str]]
+            The (hydrogen-suppressed SMILES code, name identifier) pair of each organic molecule
+
+        groups : Iterable[str] | None
+            The functional group template names to identify (None for every functional group), see :py:meth:`templates.FunctionalGroupLibrary.closure`
+
+        workers : int
+            The number of worker processes of a new pool when no ``pool`` is given (1 identifies the batch in this process)
+
+        chunk_size : int
+            The number of structures handed to a worker process at a time
+
+        pool : BatchPool | None
+            An open worker process pool to reuse across batches (see :py:func:`batchPool`), which must have been opened with the same
+            ``groups``, ``ring_perception``, ``matcher``, ``profile``, ``max_steps`` and ``max_seconds`` as this call
+
+        ring_perception : Literal["smiles", "graph"]
+            The ring perception of each molecule, see :py:class:`molecule.Molecule`
+
+        matcher : Literal["dfs", "vf2"]
+            The functional group sub-graph matching backend of each molecule, see :py:class:`molecule.Molecule`
+
+        profile : bool
+            Record the stage profile of each molecule in :py:attr:`BatchResult.profiles`, see :py:class:`profiling.StageProfile`
+
+        max_steps : int | None
+            The largest number of functional group search steps of each molecule (None for no step limit), see :py:class:`budget.WorkBudget`
+
+        max_seconds : float | None
+            The largest wall time in seconds of each molecule (None for no time limit), see :py:class:`budget.WorkBudget`
+
+        Returns
+        -------
+        BatchResult
+            The results of every structure in input order
+
+        Raises
+        ------
+        ValueError
+            When the settings of this call differ from the settings the ``pool`` was opened with
+
+        Example
+        -------
+            >>> batch = identifyMolecules([("CC(=O)OC", "methyl acetate"), ("CCO", "ethanol")], workers=4)
+            >>> batch.functional_groups_exact.toDataFrame(index=batch.names, drop_zero_columns=True)
+    """
+
+    structures = list(structures)
+    settings: "dict[str, object]" = _batchSettings(groups, ring_perception, matcher, profile, max_steps, max_seconds)
+    if pool and settings != pool.settings:
+        raise ValueError(f"The batch settings {settings} differ from the settings {pool.settings} the worker process pool was opened with")
+    library = loadFunctionalGroupLibrary()
+    columns = library.groupColumns(settings["groups"])
+
+    ##### Structure Results #####
+    if pool:
+        results = pool.pool.imap(_identifyStructure, structures, chunksize=chunk_size)
+    elif workers > 1 and len(structures) > chunk_size:
+        with multiprocessing.Pool(workers, initializer=_initializeWorker, initargs=(settings,)) as batch_pool:
+            results = batch_pool.map(_identifyStructure, structures, chunksize=chunk_size)
+    else:
+        _initializeWorker(settings)
+        results = map(_identifyStructure, structures)
+    results = list(results)
+
+    ##### Failed Structure Tracebacks & Timed Out Structure Stages #####
+    timeouts: "dict[int, str]" = {i: result.stage for i, result in enumerate(results) if isinstance(result, BudgetExceeded)}
+    errors: "dict[int, str]" = {i: str(result) for i, result in enumerate(results) if isinstance(result, (str, BudgetExceeded))}
+    records: "list[MoleculeResult | None]" = [None if i in errors else result for i, result in enumerate(results)]
+
+    return BatchResult(
+        [name for (_, name) in structures],
+        [smiles for (smiles, _) in structures],
+        numpy.array([record.aromatic_ring_count if record else 0 for record in records], dtype=numpy.int32),
+        numpy.array([record.non_aromatic_ring_count if record else 0 for record in records], dtype=numpy.int32),
+        numpy.array([record.amino_acid if record else False for record in records], dtype=bool),
+        CountMatrix.fromDicts((record.functional_groups_all if record else {} for record in records), columns),
+        CountMatrix.fromDicts((record.functional_groups_exact if record else {} for record in records), columns),
+        numpy.array([record.skipped_template_count if record else 0 for record in records], dtype=numpy.int32),
+        errors,
+        [record.profile if record else None for record in records] if profile else None,
+        timeouts,
+    )
+
+
+def batchPool(
+    workers: int,
+    groups: "Iterable[str] | None" = None,
+    ring_perception: Literal["smiles", "graph"] = "smiles",
+    matcher: Literal["dfs", "vf2"] = "vf2",
+    profile: bool = False,
+    max_steps: "int | None" = None,
+    max_seconds: "float | None" = None,
+) -> "BatchPool":
+    """Opens a worker process pool for :py:func:`identifyMolecules` which is reused across batches.
+
+        Each worker compiles the template library once when it starts, and identifies every structure it is handed
+        with the given ``groups``, ``ring_perception``, ``matcher``, ``profile`` and work budget.
+
+        Parameters
+        ----------
+        workers : int
+            The number of worker processes
+
+        groups : Iterable[str] | None
+            The functional group template names to identify (None for every functional group)
+
+        ring_perception : Literal["smiles", "graph"]
+            The ring perception of each molecule
+
+        matcher : Literal["dfs", "vf2"]
+            The functional group sub-graph matching backend of each molecule
+
+        profile : bool
+            Record the stage profile of each molecule
+
+        max_steps : int | None
+            The largest number of functional group search steps of each molecule (None for no step limit)
+
+        max_seconds : float | None
+            The largest wall time in seconds of each molecule (None for no time limit)
+
+        Returns
+        -------
+        BatchPool
+            The open worker process pool with its settings, to be used as a context manager
+    """
+    settings = _batchSettings(groups, ring_perception, matcher, profile, max_steps, max_seconds)
+    return BatchPool(multiprocessing.Pool(workers, initializer=_initializeWorker, initargs=(settings,)), settings)
+
+
+class BatchPool():
+    """A worker process pool of :py:func:`batchPool` together with the settings its workers identify every structure with.
+
+        Parameters
+        ----------
+        pool : multiprocessing.pool.Pool
+            The worker process pool, whose workers were initialized with ``settings``
+
+        settings : dict[str, object]
+            The Molecule keyword arguments of the workers
+
+        Returns
+        -------
+        BatchPool
+            The open worker process pool, to be used as a context manager
+    """
+
+    __slots__ = ("pool", "settings")
+
+    def __init__(self, pool: multiprocessing.pool.Pool, settings: "dict[str, object]"):
+        """Pairs a worker process pool with its settings"""
+
+        self.pool: multiprocessing.pool.Pool = pool
+        """The worker process pool"""
+
+        self.settings: "dict[str, object]" = settings
+        """The Molecule keyword arguments the workers identify every structure with"""
+
+    def __enter__(self) -> "BatchPool":
+        """Uses the open pool as a context manager"""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Terminates the worker processes when leaving the context"""
+        self.pool.terminate()
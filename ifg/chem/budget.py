@@ -0,0 +1,100 @@
+"""Per-molecule work budget of organic molecule identification, bounding the search steps and wall time spent on one structure"""
+
+import sys
+from time import perf_counter
+
+##### Budget Clock Check Interval #####
+CHECK_INTERVAL: int = 1024
+"""The number of search steps between two wall time checks of a :py:class:`WorkBudget` during a functional group search"""
+
+
+class BudgetExceeded(Exception):
+    """Raised when an organic molecule exceeds its :py:class:`WorkBudget`.
+
+        Parameters
+        ----------
+        stage : str
+            The identification stage the molecule was in, see :py:data:`profiling.STAGES`
+
+        steps : int
+            The search steps spent when the budget was exceeded
+
+        seconds : float
+            The wall time in seconds spent when the budget was exceeded
+
+        Returns
+        -------
+        BudgetExceeded
+            The exception, which pickles with its stage, steps and seconds
+    """
+
+    def __init__(self, stage: str, steps: int, seconds: float):
+        """Generates the exception of a molecule which exceeded its work budget"""
+        super().__init__(stage, steps, seconds)
+
+        self.stage: str = stage
+        """The identification stage the molecule was in"""
+
+        self.steps: int = steps
+        """The search steps spent when the budget was exceeded"""
+
+        self.seconds: float = seconds
+        """The wall time in seconds spent when the budget was exceeded"""
+
+    def __str__(self) -> str:
+        """String Representation of the exceeded budget"""
+        return f"Timed out in stage {self.stage} after {self.steps} search steps and {self.seconds:.3f} seconds"
+
+
+class WorkBudget():
+    """The search step and wall time budget of one organic molecule, whose clock starts when it is created.
+
+        Created by a :py:class:`molecule.Molecule` built with ``max_steps`` or ``max_seconds``, which checks the budget at the
+        end of its graph building, ring perception and start pair stages and before each functional group template search.
+        The matching backend checks the budget whenever its search steps reach the step count returned by the last :py:meth:`check`,
+        at most :py:data:`CHECK_INTERVAL` steps apart, so the wall time is read rarely and the step limit is exact.
+        A search step is a search state of the vf2 backend or a recursive :py:meth:`molecule.Molecule.DFS` call of the dfs backend, see :py:attr:`matching.Matcher.states`.
+        The accuracy filters of the matches check the wall time of the budget once per match.
+
+        Parameters
+        ----------
+        max_steps : int | None
+            The largest number of search steps of the molecule (None for no step limit)
+
+        max_seconds : float | None
+            The largest wall time in seconds of the molecule (None for no time limit)
+
+        Returns
+        -------
+        WorkBudget
+            The budget, whose clock starts now
+    """
+
+    __slots__ = ("max_steps", "max_seconds", "start", "steps")
+
+    def __init__(self, max_steps: "int | None" = None, max_seconds: "float | None" = None):
+        """Generates a work budget and starts its clock"""
+
+        self.max_steps: "int | None" = max_steps
+        """The largest number of search steps of the molecule, or None for no step limit"""
+
+        self.max_seconds: "float | None" = max_seconds
+        """The largest wall time in seconds of the molecule, or None for no time limit"""
+
+        self.start: float = perf_counter()
+        """The time the clock of the budget started"""
+
+        self.steps: int = 0
+        """The search steps of the most recent check"""
+
+    def check(self, stage: str, steps: "int | None" = None) -> int:
+        """Raises :py:class:`BudgetExceeded` when the steps (those of the most recent check when None) or the wall time exceed the budget, otherwise returns the step count of the next check"""
+
+        if steps is None:
+            steps = self.steps
+        self.steps = steps
+        seconds = perf_counter() - self.start
+        if (self.max_steps is not None and steps > self.max_steps) or (self.max_seconds is not None and seconds > self.max_seconds):
+            raise BudgetExceeded(stage, steps, seconds)
+        next_check = steps + CHECK_INTERVAL if self.max_seconds is not None else sys.maxsize
+        return min(next_check, self.max_steps + 1) if self.max_steps is not None else next_check
@@ -0,0 +1,169 @@
+"""A persistent on-disk cache of organic molecule ring and functional group results"""
+
+import glob
+import hashlib
+import json
+import os
+import sqlite3
+from typing import TYPE_CHECKING, Iterable
+
+from .constants import FUNCTIONAL_GROUP_SMILES_CODES_PATH
+
+if TYPE_CHECKING:
+    from .molecule import Molecule
+
+
+##### Cache Query Batch Size #####
+_QUERY_BATCH_SIZE = 500
+"""Number of SMILES codes looked up per query, below the SQLite bound parameter limit"""
+
+
+def moleculeResult(mol: "Molecule") -> dict:
+    """Collects the ring, amino acid and functional group results of an organic molecule into a cacheable record.
+
+        Parameters
+        ----------
+        mol : Molecule
+            The organic molecule ("mol" type) to collect the results of
+
+        Returns
+        -------
+        dict
+            The result record of the molecule (see :py:meth:`molecule.MoleculeResult.asDict`), whose functional group count dictionaries keep their order
+    """
+    return mol.result().asDict()
+
+
+def cacheVersion(library_path: str = FUNCTIONAL_GROUP_SMILES_CODES_PATH) -> str:
+    """Hashes the functional group SMILES codes csv file and the chem package source code into a cache version.
+
+        Any edit to the functional group templates or to the identification code changes the version,
+        which invalidates every result cached under another version.
+
+        Parameters
+        ----------
+        library_path : str
+            The functional group SMILES codes csv file the results are identified with
+
+        Returns
+        -------
+        str
+            The hexadecimal SHA-256 digest of the template csv file and chem source files
+    """
+    digest = hashlib.sha256()
+    for path in [library_path, *sorted(glob.glob(os.path.join(os.path.dirname(__file__), "*.py")))]:
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+def groupsKey(groups: "Iterable[str] | None" = None) -> str:
+    """The cache key of a functional group selection, ``*`` for every functional group or the sorted JSON list of the requested functional group names"""
+    return "*" if groups is None else json.dumps(sorted(set(groups)))
+
+
+class ResultCache():
+    """A persistent SQLite cache of organic molecule result records keyed by SMILES code and functional group selection.
+
+        Opening a cache deletes the results of every other cache version, so a cache file only
+        ever holds results of the current template csv file and source code. The results of every functional group
+        selection are kept side by side (see :py:func:`groupsKey`), so runs alternating between selections all reuse their results.
+
+        Parameters
+        ----------
+        path : str
+            The SQLite database file of the cache, which is created when it does not exist
+
+        library_path : str
+            The functional group SMILES codes csv file the results are identified with
+
+        groups : Iterable[str] | None
+            The functional group names the results are restricted to (None for every functional group)
+
+        Returns
+        -------
+        ResultCache
+            The open result cache
+
+        Example
+        -------
+            >>> with ResultCache("results.sqlite") as cache:
+            ...     cache.putMany([(smiles, moleculeResult(mol))])
+            ...     cache.getMany([smiles])
+    """
+
+    def __init__(self, path: str, library_path: str = FUNCTIONAL_GROUP_SMILES_CODES_PATH, groups: "Iterable[str] | None" = None):
+        """Opens a result cache file and removes its stale results"""
+
+        self.path: str = path
+        """The SQLite database file of the cache"""
+
+        self.version: str = cacheVersion(library_path)
+        """The cache version of the current template csv file and source code"""
+
+        self.groups_key: str = groupsKey(groups)
+        """The cache key of the requested functional groups"""
+
+        self.connection: sqlite3.Connection = sqlite3.connect(path)
+        """The connection to the SQLite database file"""
+
+        ##### Cache Table Setup (replacing a table without functional group selections) & Stale Result Removal #####
+        with self.connection:
+            columns = [row[1] for row in self.connection.execute("PRAGMA table_info(results)")]
+            if columns and "groups" not in columns:
+                self.connection.execute("DROP TABLE results")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "smiles TEXT NOT NULL, groups TEXT NOT NULL, version TEXT NOT NULL, result TEXT NOT NULL, PRIMARY KEY (smiles, groups))"
+            )
+            self.connection.execute("DELETE FROM results WHERE version != ?", (self.version,))
+
+    def getMany(self, smiles_codes: "Iterable[str]") -> "dict[str, dict]":
+        """Looks up the cached result records of SMILES codes.
+
+            Parameters
+            ----------
+            smiles_codes : Iterable[str]
+                The SMILES codes to look up
+
+            Returns
+            -------
+            dict[str, dict]
+                Dictionary of SMILES code to its cached result record, without the SMILES codes which are not cached
+        """
+        smiles_codes = list(dict.fromkeys(smiles_codes))
+        results: "dict[str, dict]" = {}
+        for start in range(0, len(smiles_codes), _QUERY_BATCH_SIZE):
+            batch = smiles_codes[start:start+_QUERY_BATCH_SIZE]
+            rows = self.connection.execute(
+                f"SELECT smiles, result FROM results WHERE groups = ? AND version = ? AND smiles IN ({', '.join('?'*len(batch))})",
+                (self.groups_key, self.version, *batch),
+            )
+            results.update((smiles, json.loads(result)) for smiles, result in rows)
+        return results
+
+    def putMany(self, results: "Iterable[tuple[str, dict]]"):
+        """Stores the result records of SMILES codes in one transaction.
+
+            Parameters
+            ----------
+            results : Iterable[tuple[str, dict]]
+                The (SMILES code, result record) pairs to store, see :py:func:`moleculeResult`
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO results (smiles, groups, version, result) VALUES (?, ?, ?, ?)",
+                ((smiles, self.groups_key, self.version, json.dumps(result)) for smiles, result in results),
+            )
+
+    def close(self):
+        """Closes the connection to the cache file"""
+        self.connection.close()
+
+    def __enter__(self) -> "ResultCache":
+        """Uses the open cache as a context manager"""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Closes the cache when leaving the context"""
+        self.close()
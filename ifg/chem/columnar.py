@@ -0,0 +1,195 @@
+"""A columnar binary file format for the all and exact functional group data tables"""
+
+import tempfile
+import zipfile
+from typing import IO, Sequence
+
+import numpy
+import pandas
+
+from .counts import CountMatrix
+from .sinks import SHEET_NAMES, STRUCTURE_COLUMNS, Sink
+
+##### Columnar Flush Size #####
+_FLUSH_SIZE = 4096
+"""Number of buffered rows appended to the column spool files at a time"""
+
+##### Columnar Column Types #####
+_STRING_COLUMNS: "tuple[str, ...]" = ("Refcode", "SMILES")
+"""The variable-length string columns shared by both tables, stored as UTF-8 bytes and end offsets"""
+
+_RING_COLUMNS: "tuple[str, ...]" = ("Aromatic Rings", "Non Aromatic Rings", "Rings")
+"""The integer ring count columns shared by both tables"""
+
+_COUNT_DTYPE = numpy.dtype("<i4")
+"""The little-endian integer type of the ring and functional group count columns"""
+
+
+class ColumnarSink(Sink):
+    """A columnar output sink which stores every column of the all and exact data tables as a separate array of a numpy ``.npz`` file.
+
+        The file has a fixed column schema. ``Refcode`` and ``SMILES`` are stored once as UTF-8 bytes (``<col>/data``) and
+        row end offsets (``<col>/offsets``), the ring counts and the ``AminoAcid`` flag are stored once as integer and boolean
+        arrays, and each functional group column is stored as an integer array per table (``all_data/<col>`` and ``exact_data/<col>``),
+        with ``columns`` holding the functional group column vocabulary and ``order/all_data`` and ``order/exact_data`` holding the first-seen
+        order of the nonzero functional group columns of each table, which is the column order of the excel sheet of the same rows. Rows are appended to one temporary spool file per column
+        as they arrive, and the columns are written into the file one at a time when the sink is closed, so memory stays flat in
+        the number of structures.
+
+        Parameters
+        ----------
+        path : str
+            The columnar (npz) file to create
+
+        fg_columns : Sequence[str]
+            The fixed functional group columns, see :py:attr:`templates.FunctionalGroupLibrary.columns`
+
+        Returns
+        -------
+        ColumnarSink
+            The open columnar sink
+    """
+
+    def __init__(self, path: str, fg_columns: "Sequence[str]"):
+        """Opens the column spool files of a columnar sink"""
+
+        self.path: str = path
+        """The columnar file created by the sink"""
+
+        self.fg_columns: "tuple[str, ...]" = tuple(fg_columns)
+        """The fixed functional group columns of both tables"""
+
+        self.keys: "list[str]" = [
+            *(f"{col}/{part}" for col in _STRING_COLUMNS for part in ("data", "offsets")),
+            *_RING_COLUMNS,
+            "AminoAcid",
+            *(f"{sheet_name}/{col}" for sheet_name in SHEET_NAMES for col in self.fg_columns),
+        ]
+        """The array keys of the columnar file in file order"""
+
+        self.spools: "dict[str, IO[bytes]]" = {key: tempfile.TemporaryFile() for key in self.keys}
+        """The temporary binary spool file of each array key"""
+
+        self.buffer: "list[tuple[dict, dict]]" = []
+        """The (all row, exact row) pairs not yet appended to the spool files"""
+
+        self.string_ends: "dict[str, int]" = dict.fromkeys(_STRING_COLUMNS, 0)
+        """The byte length of each string column spooled so far"""
+
+        self.columns: "tuple[dict[str, None], dict[str, None]]" = ({}, {})
+        """The first-seen ordered nonzero functional group columns of the all and exact data rows"""
+
+    def write(self, all_row: dict, exact_row: dict):
+        """Buffers the all and exact functional group format data rows of one structure"""
+        for columns, row in zip(self.columns, (all_row, exact_row)):
+            columns.update((col, None) for col, count in row.items() if count and col not in STRUCTURE_COLUMNS)
+        self.buffer.append((all_row, exact_row))
+        if len(self.buffer) >= _FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Appends the buffered rows to the column spool files"""
+
+        if not self.buffer:
+            return
+        all_rows = [all_row for all_row, _ in self.buffer]
+
+        ##### String Columns #####
+        for col in _STRING_COLUMNS:
+            encoded = [row[col].encode("UTF-8") for row in all_rows]
+            self.spools[f"{col}/data"].write(b"".join(encoded))
+            offsets = numpy.cumsum([len(value) for value in encoded], dtype="<i8") + self.string_ends[col]
+            self.spools[f"{col}/offsets"].write(offsets.tobytes())
+            self.string_ends[col] = int(offsets[-1])
+
+        ##### Ring Count & Amino Acid Columns #####
+        for col in _RING_COLUMNS:
+            self.spools[col].write(numpy.array([row[col] for row in all_rows], dtype=_COUNT_DTYPE).tobytes())
+        self.spools["AminoAcid"].write(numpy.array([row["AminoAcid"] == "Yes" for row in all_rows], dtype=bool).tobytes())
+
+        ##### Functional Group Count Columns #####
+        for sheet_position, sheet_name in enumerate(SHEET_NAMES):
+            counts = CountMatrix.fromDicts(
+                ({col: count for col, count in rows[sheet_position].items() if col not in STRUCTURE_COLUMNS} for rows in self.buffer),
+                self.fg_columns,
+            )
+            for col, column_counts in zip(self.fg_columns, counts.toarray().T):
+                self.spools[f"{sheet_name}/{col}"].write(column_counts.astype(_COUNT_DTYPE).tobytes())
+
+        self.buffer.clear()
+
+    def close(self):
+        """Writes every spooled column into the columnar file"""
+
+        self.flush()
+        with zipfile.ZipFile(self.path, mode="w", compression=zipfile.ZIP_STORED, allowZip64=True) as npz_file:
+
+            ##### Functional Group Column Vocabulary #####
+            with npz_file.open("columns.npy", mode="w", force_zip64=True) as array_file:
+                numpy.lib.format.write_array(array_file, numpy.array(self.fg_columns, dtype=str))
+
+            ##### First-Seen Functional Group Column Orders #####
+            for sheet_name, columns in zip(SHEET_NAMES, self.columns):
+                with npz_file.open(f"order/{sheet_name}.npy", mode="w", force_zip64=True) as array_file:
+                    numpy.lib.format.write_array(array_file, numpy.array(list(columns), dtype=str))
+
+            ##### Spooled Columns Loop #####
+            for key in self.keys:
+                spool = self.spools[key]
+                spool.seek(0)
+                dtype = (
+                    numpy.uint8 if key.endswith("/data") else
+                    numpy.dtype("<i8") if key.endswith("/offsets") else
+                    bool if key == "AminoAcid" else
+                    _COUNT_DTYPE
+                )
+                with npz_file.open(key + ".npy", mode="w", force_zip64=True) as array_file:
+                    numpy.lib.format.write_array(array_file, numpy.frombuffer(spool.read(), dtype=dtype))
+                spool.close()
+
+
+def readColumnar(path: str, sheet_name: str = "exact_data", drop_zero_columns: bool = True) -> pandas.DataFrame:
+    """Reads one data table of a columnar functional group data file written by :py:class:`ColumnarSink`.
+
+        Parameters
+        ----------
+        path : str
+            The columnar (npz) file to read
+
+        sheet_name : str
+            The data table to read, ``all_data`` or ``exact_data``
+
+        drop_zero_columns : bool
+            Whether to leave out the functional group columns which are 0 for every structure,
+            which gives the columns of the excel sheet of the same data
+
+        Returns
+        -------
+        pandas.DataFrame
+            The data table in the column layout of the excel sheet, with the functional group columns in the first-seen order of the
+            excel sheet followed by the remaining columns in template library order
+    """
+
+    with numpy.load(path) as npz_file:
+
+        ##### String Columns #####
+        table: "dict[str, object]" = {}
+        for col in _STRING_COLUMNS:
+            data, offsets = npz_file[f"{col}/data"].tobytes(), npz_file[f"{col}/offsets"]
+            starts = numpy.concatenate(([0], offsets[:-1]))
+            table[col] = [data[start:end].decode("UTF-8") for start, end in zip(starts.tolist(), offsets.tolist())]
+
+        ##### Ring Count & Amino Acid Columns #####
+        for col in _RING_COLUMNS:
+            table[col] = npz_file[col]
+        table["AminoAcid"] = numpy.where(npz_file["AminoAcid"], "Yes", "No")
+
+        ##### Functional Group Count Columns #####
+        fg_columns: "list[str]" = npz_file["columns"].tolist()
+        first_seen: "list[str]" = npz_file[f"order/{sheet_name}"].tolist() if f"order/{sheet_name}" in npz_file.files else []
+        for col in dict.fromkeys([*first_seen, *fg_columns]):
+            counts = npz_file[f"{sheet_name}/{col}"]
+            if not drop_zero_columns or counts.any():
+                table[col] = counts
+
+    return pandas.DataFrame(table)
@@ -1,5 +1,6 @@
 """Constant variables used across the program source files"""
 
+import os
 import re
 
 ##### Regular Expressions #####
@@ -24,6 +25,9 @@ BRACKET_REGEX = re.compile(r'[\[\]]')
 SMILES_REGEX = re.compile(r'(Br[+-]?|Cl[+-]?|[a-zA-Z][+-]?|[=#]|[0-9]{1}|[()])')
 """Regular Expression that captures all individual symbols of significance in a hydrogen-suppressed SMILES code"""
 
+TOKEN_REGEX = re.compile(r'(?P<atom>Br[+-]?|Cl[+-]?|[a-zA-Z][+-]?)|(?P<bond>[=#])|(?P<digit>[0-9]{1})|(?P<parenth>[()])')
+"""Regular Expression that captures all individual symbols of significance in a hydrogen-suppressed SMILES code, named by their kind of symbol"""
+
 AMINO_ACID_REGEX = re.compile(r'[nN]H[23]?\+')
 """Regular Expression that matches an amino acid"""
 
@@ -50,3 +54,16 @@ ELECTRON_BOND_COUNTS: "dict[str, int]" = {
     '#': 3
 }
 """Dictionary of bond symbol to number of valence electrons given"""
+
+##### Functional Group Ring Classification Prefixes #####
+RING_NOMENCLATURE: "dict[str, str]" = {
+    'aromatic': 'Aromatic ',
+    'non-aromatic': 'Non Aromatic ',
+    'non-cyclic': '',
+}
+"""Dictionary of functional group match ring type to the prefix of its ring-classified functional group name"""
+
+
+##### Functional Group Templates File #####
+FUNCTIONAL_GROUP_SMILES_CODES_PATH: str = os.path.dirname(__file__) + "/data/functional_group_smiles_codes.csv"
+"""File of the hydrogen-suppressed SMILES code and name of every identifiable functional group"""
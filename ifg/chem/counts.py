@@ -0,0 +1,180 @@
+"""A sparse molecule by functional group count matrix for batches of functional group results"""
+
+from array import array
+from typing import Iterable, Mapping, Sequence
+
+import numpy
+import pandas
+
+
+class CountMatrix():
+    """A sparse molecule by functional group count matrix in compressed sparse row (CSR) form.
+
+        Only the non-zero counts are stored, so memory grows with the number of non-zero counts instead of
+        molecules times functional group columns. The columns are a stable vocabulary, normally the
+        :py:attr:`templates.FunctionalGroupLibrary.columns` of the template library, so the matrices of
+        different batches line up column by column.
+
+        Parameters
+        ----------
+        columns : Sequence[str]
+            The functional group column vocabulary
+
+        indptr : numpy.ndarray
+            The start of the non-zero counts of each row in ``indices`` and ``data``, followed by the number of non-zero counts
+
+        indices : numpy.ndarray
+            The column position of each non-zero count
+
+        data : numpy.ndarray
+            The value of each non-zero count
+
+        Returns
+        -------
+        CountMatrix
+            The sparse count matrix
+
+        Example
+        -------
+            >>> matrix = CountMatrix.fromDicts([mol.functional_groups_exact for mol in mols], loadFunctionalGroupLibrary().columns)
+            >>> matrix.toDataFrame(drop_zero_columns=True)
+    """
+
+    __slots__ = ("columns", "indptr", "indices", "data")
+
+    def __init__(self, columns: "Sequence[str]", indptr: numpy.ndarray, indices: numpy.ndarray, data: numpy.ndarray):
+        """Generates a sparse count matrix from its CSR arrays"""
+
+        self.columns: "tuple[str, ...]" = tuple(columns)
+        """The functional group column vocabulary"""
+
+        self.indptr: numpy.ndarray = indptr
+        """The start of the non-zero counts of each row, followed by the number of non-zero counts"""
+
+        self.indices: numpy.ndarray = indices
+        """The column position of each non-zero count"""
+
+        self.data: numpy.ndarray = data
+        """The value of each non-zero count"""
+
+    @classmethod
+    def fromDicts(cls, counts: "Iterable[Mapping[str, int]]", columns: "Sequence[str]") -> "CountMatrix":
+        """Builds a sparse count matrix from one functional group count dictionary per molecule.
+
+            Parameters
+            ----------
+            counts : Iterable[Mapping[str, int]]
+                The functional group counts of each molecule, such as :py:attr:`molecule.Molecule.functional_groups_exact`,
+                whose names must all be in ``columns``
+
+            columns : Sequence[str]
+                The functional group column vocabulary
+
+            Returns
+            -------
+            CountMatrix
+                The sparse count matrix with one row per count dictionary
+        """
+
+        column_positions: dict[str, int] = {col: j for j, col in enumerate(columns)}
+        indptr, indices, data = array("q", [0]), array("i"), array("i")
+
+        ##### Molecule Counts Loop #####
+        for row in counts:
+            for col, count in row.items():
+                if count:
+                    indices.append(column_positions[col])
+                    data.append(count)
+            indptr.append(len(indices))
+
+        return cls(columns, numpy.frombuffer(indptr, dtype=numpy.int64), numpy.frombuffer(indices, dtype=numpy.int32), numpy.frombuffer(data, dtype=numpy.int32))
+
+    @classmethod
+    def concatenate(cls, matrices: "Sequence[CountMatrix]", columns: "Sequence[str]") -> "CountMatrix":
+        """Stacks the rows of sparse count matrices with the same column vocabulary into one matrix.
+
+            Parameters
+            ----------
+            matrices : Sequence[CountMatrix]
+                The count matrices to stack in order, which must all have the ``columns`` vocabulary
+
+            columns : Sequence[str]
+                The functional group column vocabulary, which is also used when there are no matrices
+
+            Returns
+            -------
+            CountMatrix
+                The stacked sparse count matrix
+        """
+
+        columns = tuple(columns)
+        assert all(matrix.columns == columns for matrix in matrices)
+        offsets = numpy.cumsum([0] + [matrix.nnz for matrix in matrices])
+        return cls(
+            columns,
+            numpy.concatenate([numpy.zeros(1, dtype=numpy.int64)] + [matrix.indptr[1:] + offset for matrix, offset in zip(matrices, offsets)]),
+            numpy.concatenate([numpy.zeros(0, dtype=numpy.int32)] + [matrix.indices for matrix in matrices]),
+            numpy.concatenate([numpy.zeros(0, dtype=numpy.int32)] + [matrix.data for matrix in matrices]),
+        )
+
+    @property
+    def shape(self) -> "tuple[int, int]":
+        """The (molecules, functional group columns) shape of the matrix"""
+        return (len(self.indptr) - 1, len(self.columns))
+
+    @property
+    def nnz(self) -> int:
+        """The number of non-zero counts in the matrix"""
+        return int(self.indptr[-1])
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes of the CSR arrays of the matrix"""
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes
+
+    def __len__(self) -> int:
+        """Number of molecule rows in the matrix"""
+        return self.shape[0]
+
+    def rowPositions(self) -> numpy.ndarray:
+        """The row position of each non-zero count"""
+        return numpy.repeat(numpy.arange(self.shape[0]), numpy.diff(self.indptr))
+
+    def row(self, i: int) -> "dict[str, int]":
+        """The non-zero functional group counts of one molecule row in stored order"""
+        start, end = self.indptr[i], self.indptr[i+1]
+        return {self.columns[j]: int(count) for j, count in zip(self.indices[start:end], self.data[start:end])}
+
+    def column(self, col: str) -> numpy.ndarray:
+        """The dense counts of one functional group column for every molecule row"""
+        dense = numpy.zeros(self.shape[0], dtype=numpy.int32)
+        mask = self.indices == self.columns.index(col)
+        dense[self.rowPositions()[mask]] = self.data[mask]
+        return dense
+
+    def toarray(self) -> numpy.ndarray:
+        """Converts the matrix into a dense (molecules, functional group columns) integer array"""
+        dense = numpy.zeros(self.shape, dtype=numpy.int32)
+        dense[self.rowPositions(), self.indices] = self.data
+        return dense
+
+    def toDataFrame(self, index: "Sequence | None" = None, drop_zero_columns: bool = False) -> pandas.DataFrame:
+        """Converts the matrix into a dense pandas dataframe.
+
+            Parameters
+            ----------
+            index : Sequence | None
+                The row labels of the dataframe, such as the structure refcodes (a range index when None)
+
+            drop_zero_columns : bool
+                Whether to leave out the functional group columns which are 0 for every molecule
+
+            Returns
+            -------
+            pandas.DataFrame
+                The dense count dataframe with the functional group columns in vocabulary order
+        """
+        dataframe = pandas.DataFrame(self.toarray(), columns=list(self.columns), index=index)
+        if drop_zero_columns:
+            dataframe = dataframe.iloc[:, numpy.unique(self.indices)]
+        return dataframe
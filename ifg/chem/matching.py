@@ -0,0 +1,425 @@
+"""Functional group sub-graph matching backends for the software molecule graph"""
+
+from collections import Counter
+from operator import itemgetter
+import sys
+from typing import TYPE_CHECKING, Iterable, Sequence
+import weakref
+
+from .budget import WorkBudget
+from .vertex import Vertex
+
+if TYPE_CHECKING:
+    from .molecule import Molecule
+    from .templates import FunctionalGroupTemplate
+
+
+class Matcher():
+    """A functional group sub-graph matching backend bound to one organic molecule graph.
+
+        A backend searches the organic molecule for a functional group sub-graph starting from
+        one :ref:`Like Vertex Pair <like-vertex-pair-ref>`, and every backend must find the same
+        matched vertex pairs for the same start pair.
+
+        Parameters
+        ----------
+        mol : Molecule
+            The organic molecule graph searched for functional group sub-graphs
+
+        Returns
+        -------
+        Matcher
+            The matching backend for the organic molecule
+    """
+
+    def __init__(self, mol: "Molecule"):
+        """Binds a matching backend to an organic molecule graph"""
+
+        self.mol: "Molecule" = mol
+        """The organic molecule graph searched for functional group sub-graphs"""
+
+        ##### Keyed Incident Edges (one pass over the edges in ascending edge index order) #####
+        neighbors: "list[list[tuple[int, int, int]]]" = [[] for _ in mol.vertices]
+        for edge in mol.edges:
+            vertex_a, vertex_b = edge.atoms
+            neighbors[vertex_a.index].append((edge.index, vertex_b.index, edgeKey(edge.bond_type, vertex_b)))
+            neighbors[vertex_b.index].append((edge.index, vertex_a.index, edgeKey(edge.bond_type, vertex_a)))
+
+        self.neighbors: "list[tuple[tuple[int, int, int], ...]]" = [tuple(incident_edges) for incident_edges in neighbors]
+        """The (edge index, complementary vertex index, edge key) of each incident edge of each molecular vertex by vertex index"""
+
+        ##### Search Counters #####
+        self.searches: int = 0
+        """The number of searches started from a like vertex pair"""
+
+        self.states: int = 0
+        """The number of search states created by the backend (search states of the vf2 backend, recursive calls of the dfs backend)"""
+
+        self.candidates: int = 0
+        """The number of (functional group edge, molecular edge) candidate pairs tested by the backend (counted by backends with explicit search states)"""
+
+        ##### Work Budget #####
+        self.budget: "WorkBudget | None" = mol.budget
+        """The work budget of the organic molecule, or None when its search is unlimited"""
+
+        self.step_limit: int = 0 if mol.budget else sys.maxsize
+        """The search step count at which the work budget is checked next (never without a budget)"""
+
+    def checkBudget(self):
+        """Checks the work budget of the organic molecule after the search states so far and schedules its next check"""
+        self.step_limit = self.budget.check("match", self.states)
+
+    def match(self, fg: "Molecule", fg_vertex: Vertex, mol_vertex: Vertex) -> "dict[int, int]":
+        """Searches the organic molecule for a functional group sub-graph starting from a like vertex pair.
+
+            Parameters
+            ----------
+            fg : Molecule
+                The functional group graph being searched for
+
+            fg_vertex : Vertex
+                The *core* functional group vertex which begins the search
+
+            mol_vertex : Vertex
+                The organic molecule vertex paired with ``fg_vertex``
+
+            Returns
+            -------
+            dict[int, int]
+                The matched vertex pairs by index in the form functional_group_index : molecular_index,
+                which is empty or partial when the functional group was not found
+        """
+        raise NotImplementedError
+
+
+class DFSMatcher(Matcher):
+    """The recursive depth first search and backtracking backend of :py:meth:`molecule.Molecule.DFS`"""
+
+    def match(self, fg: "Molecule", fg_vertex: Vertex, mol_vertex: Vertex) -> "dict[int, int]":
+        """Searches the organic molecule for a functional group sub-graph with :py:meth:`molecule.Molecule.DFS`"""
+        self.searches+=1
+        fg_matched_atoms, _, _ = self.mol.DFS(fg, fg_vertex, mol_vertex, [], [], self)
+        return fg_matched_atoms
+
+
+class VF2Matcher(Matcher):
+    """An iterative VF2-style state-space search backend.
+
+        The search state is kept on an explicit stack instead of the call stack, so no
+        molecule is limited by the recursion depth. Used molecular and functional group edges
+        are integer bitsets, and each candidate molecular edge is checked for feasibility
+        (unused, bond type, complementary symbol and total degree as one integer edge key, then hidden hydrogens) 
+        before a new state is created for it. A state is also only created when its molecular vertex has an incident
+        edge with the key of every *core* edge of its functional group vertex (look-ahead pruning). The order of the
+        search and its first-match acceptance of each functional group edge are those of :py:meth:`molecule.Molecule.DFS`,
+        so both backends find the same matched vertex pairs.
+
+        Notes
+        -----
+            | `Algorithm Variables Reference`
+            | ``state``          (list):                 a search state of [mol vertex index, unsatisfied fg core edges, fg edge position, mol edge position, used mol edges bitset, used fg edges bitset, matched vertex pairs]
+            | ``stack``          (list[list]):           the stack of open search states, where the last state is being expanded
+            | ``result``         (tuple | None):         the matched vertex pairs and used edge bitsets of the most recently satisfied state
+    """
+
+    def __init__(self, mol: "Molecule"):
+        """Binds the search to the hidden hydrogens and keyed incident edges of an organic molecule graph"""
+
+        super().__init__(mol)
+
+        self.implicit_degrees: list[int] = [vertex.implicit_degree for vertex in mol.vertices]
+        """The number of hidden hydrogens of each molecular vertex by vertex index"""
+
+        self.neighbor_keys: "list[frozenset[int]]" = [frozenset(edge[2] for edge in incident_edges) for incident_edges in self.neighbors]
+        """The set of edge keys of the incident edges of each molecular vertex by vertex index"""
+
+        self.fg: "Molecule | None" = None
+        """The most recently searched functional group graph"""
+
+        self.compiled_fg: "tuple[list[tuple[tuple[int, int, int], ...]], list[frozenset[int]], list[int]]" = ([], [], [])
+        """The compiled core edges, core edge keys and hidden hydrogens of the most recently searched functional group graph"""
+
+    def match(self, fg: "Molecule", fg_vertex: Vertex, mol_vertex: Vertex) -> "dict[int, int]":
+        """Searches the organic molecule for a functional group sub-graph with an iterative state-space search"""
+
+        ##### Compiled Functional Group & Molecule Properties #####
+        if fg is not self.fg:
+            self.fg, self.compiled_fg = fg, compileTemplate(fg)
+        core_edges, core_keys, implicit = self.compiled_fg
+        implicit_degrees, neighbors, neighbor_keys = self.implicit_degrees, self.neighbors, self.neighbor_keys
+
+        ##### Start State #####
+        self.searches+=1
+        fg_index, mol_index = fg_vertex.index, mol_vertex.index
+        if (implicit[fg_index] and implicit_degrees[mol_index] < implicit[fg_index]) or not core_keys[fg_index] <= neighbor_keys[mol_index]:
+            return {}
+        if not core_edges[fg_index]:
+            return {fg_index: mol_index}
+        stack: list[list] = [[mol_index, core_edges[fg_index], 0, 0, 0, 0, {fg_index: mol_index}]]
+        self.states+=1
+        if self.states >= self.step_limit:
+            self.checkBudget()
+
+        ##### State Expansion Loop #####
+        while stack:
+            state = stack[-1]
+            mol_index, fg_edges, fg_edge_position, mol_edge_position, used_mol_edges, used_fg_edges, _ = state
+            fg_edge_index, fg_complement_index, fg_edge_key = fg_edges[fg_edge_position]
+            complement_implicit = implicit[fg_complement_index]
+            candidates = neighbors[mol_index]
+            candidates_start = mol_edge_position
+            result = None
+
+            ##### Candidate Molecular Edges Loop #####
+            while mol_edge_position < len(candidates):
+                mol_edge_index, mol_complement_index, mol_edge_key = candidates[mol_edge_position]
+                mol_edge_position+=1
+
+                ##### Feasibility Pruning #####
+                if (
+                    mol_edge_key != fg_edge_key
+                    or (used_mol_edges >> mol_edge_index) & 1
+                    or (complement_implicit and implicit_degrees[mol_complement_index] < complement_implicit)
+                    or not core_keys[fg_complement_index] <= neighbor_keys[mol_complement_index]
+                ):
+                    continue
+
+                ##### New State Edges #####
+                child_used_mol_edges = used_mol_edges | (1 << mol_edge_index)
+                child_used_fg_edges = used_fg_edges | (1 << fg_edge_index)
+                child_fg_edges = tuple(edge for edge in core_edges[fg_complement_index] if not (child_used_fg_edges >> edge[0]) & 1)
+
+                ##### Functional Group End Graph Boundary Case #####
+                if not child_fg_edges:
+                    result = ({fg_complement_index: mol_complement_index}, child_used_mol_edges, child_used_fg_edges)
+                    break
+
+                ##### New State Descent #####
+                state[3] = mol_edge_position
+                stack.append([mol_complement_index, child_fg_edges, 0, 0, child_used_mol_edges, child_used_fg_edges, {fg_complement_index: mol_complement_index}])
+                self.states+=1
+                if self.states >= self.step_limit:
+                    self.checkBudget()
+                break
+
+            ##### Unsatisfied Functional Group Edge (Backtrack To Parent State) #####
+            else:
+                self.candidates+=mol_edge_position-candidates_start
+                stack.pop()
+                continue
+            self.candidates+=mol_edge_position-candidates_start
+
+            ##### Satisfied Functional Group Edges Collection #####
+            while result is not None:
+                state = stack[-1]
+                state[6].update(result[0])
+                state[4] |= result[1]
+                state[5] |= result[2]
+                state[2] += 1
+                state[3] = 0
+                result = None
+
+                ##### All State Core Edges Satisfied #####
+                if state[2] == len(state[1]):
+                    stack.pop()
+                    if not stack:
+                        return state[6]
+                    result = (state[6], state[4], state[5])
+
+        ##### Exhausted Search #####
+        return {}
+
+
+##### Edge Keys #####
+_edge_keys: "dict[tuple[str, str, int], int]" = {}
+"""Dictionary of (bond type, complementary symbol, complementary total degree) to its integer edge key"""
+
+
+def edgeKey(bond_type: str, complement: Vertex) -> int:
+    """Gets the integer key shared by every edge of the same bond type to a vertex of the same symbol and total degree.
+
+        Parameters
+        ----------
+        bond_type : str
+            The type of bond of the edge
+
+        complement : Vertex
+            The complementary vertex the edge leads to
+
+        Returns
+        -------
+        int
+            The edge key, which is unique to its structure within a process
+    """
+    return _edge_keys.setdefault((bond_type, complement.symbol, complement.total_degree), len(_edge_keys))
+
+
+##### Compiled Functional Group Templates #####
+_compiled_templates: "weakref.WeakKeyDictionary[Molecule, tuple[list[tuple[tuple[int, int, int], ...]], list[frozenset[int]], list[int]]]" = weakref.WeakKeyDictionary()
+"""Dictionary of functional group graph to its compiled core edges, core edge keys and hidden hydrogens per vertex"""
+
+
+def compileTemplate(fg: "Molecule") -> "tuple[list[tuple[tuple[int, int, int], ...]], list[frozenset[int]], list[int]]":
+    """Compiles a functional group graph into the core edges, core edge keys and hidden hydrogens of each of its vertices.
+
+        Parameters
+        ----------
+        fg : Molecule
+            The functional group graph to compile, which is compiled once and must not be modified afterwards
+
+        Returns
+        -------
+        core_edges : list[tuple[tuple[int, int, int], ...]]
+            The (edge index, complementary vertex index, edge key) of each edge between two *core* vertices, 
+            per functional group vertex index in ascending edge index order
+
+        core_keys : list[frozenset[int]]
+            The set of edge keys of the *core* edges of each functional group vertex by vertex index
+
+        implicit : list[int]
+            The number of hidden hydrogens of each functional group vertex by vertex index
+    """
+
+    if fg in _compiled_templates:
+        return _compiled_templates[fg]
+
+    ##### Core Edges & Hidden Hydrogens Compilation #####
+    core_edges = [
+        tuple(
+            (edge.index, complement.index, edgeKey(edge.bond_type, complement))
+            for edge in fg.adjacency[vertex.index] if 'R' not in edge.symbols
+            for complement in (edge.complement_vertex(vertex.index),)
+        )
+        for vertex in fg.vertices
+    ]
+    core_keys = [frozenset(edge[2] for edge in vertex_core_edges) for vertex_core_edges in core_edges]
+    implicit = [vertex.implicit_degree for vertex in fg.vertices]
+
+    _compiled_templates[fg] = (core_edges, core_keys, implicit)
+    return (core_edges, core_keys, implicit)
+
+
+class DiscriminationTree():
+    """A discrimination tree shared by the start vertices of every functional group template of a library.
+
+        Every *core* functional group vertex is a possible start of a search, and its star (its symbol and total degree,
+        then the edge keys of its *core* edges) must be present around any molecular vertex it is paired with.
+        The stars of every template are merged into one prefix tree, where the root is chosen by symbol and
+        total degree, and each lower level requires a number of incident edges of one edge key. Edge keys shared by
+        more templates are placed closer to the root, so a common core such as the C=O of the carbonyl templates is
+        checked once per molecular vertex and then branches into every template that extends it.
+
+        Parameters
+        ----------
+        templates : Iterable[FunctionalGroupTemplate]
+            The compiled functional group templates of a library, in library order
+
+        included : Sequence[bool] | None
+            Whether each template by template position is merged into the tree (every template when None)
+
+        Returns
+        -------
+        DiscriminationTree
+            The shared start vertex tree of the templates
+
+        Notes
+        -----
+            | `Algorithm Variables Reference`
+            | ``node``           (tuple[dict, list]):    a tree node of (edge key and count : child node, start leaves satisfied at the node)
+            | ``leaf``           (tuple[int, int, int]): a start of (template position, functional group vertex index, hidden hydrogens)
+            | ``key_counts``     (Counter[int]):         the number of incident edges of each edge key of a molecular vertex
+    """
+
+    __slots__ = ("roots", "template_count")
+
+    def __init__(self, templates: "Iterable[FunctionalGroupTemplate]", included: "Sequence[bool] | None" = None):
+        """Merges the start vertex stars of every functional group template into one tree"""
+
+        ##### Start Vertex Stars #####
+        stars: "list[tuple[tuple[str, int], Counter[int], tuple[int, int, int]]]" = []
+        template_count = 0
+        for template_position, template in enumerate(templates):
+            template_count = template_position + 1
+            if included is not None and not included[template_position]:
+                continue
+            core_edges, _, implicit = compileTemplate(template.graph)
+            for fg_vertex in template.graph.vertices:
+                if fg_vertex.symbol != 'R':
+                    stars.append((
+                        (fg_vertex.symbol, fg_vertex.total_degree),
+                        Counter(edge[2] for edge in core_edges[fg_vertex.index]),
+                        (template_position, fg_vertex.index, implicit[fg_vertex.index]),
+                    ))
+
+        ##### Shared Prefix Ordering #####
+        frequency = Counter(label for _, star, _ in stars for label in star.items())
+
+        ##### Tree Construction #####
+        self.roots: "dict[tuple[str, int], tuple[dict, list[tuple[int, int, int]]]]" = {}
+        """Dictionary of (symbol, total degree) to the root node of the start vertices of that symbol and total degree"""
+
+        for root_key, star, leaf in stars:
+            node = self.roots.setdefault(root_key, ({}, []))
+            for label in sorted(star.items(), key=lambda label: (-frequency[label], label)):
+                node = node[0].setdefault(label, ({}, []))
+            node[1].append(leaf)
+
+        self.template_count: int = template_count
+        """The number of functional group templates in the tree"""
+
+    def startPairs(self, matcher: Matcher, screened: "Sequence[bool] | None" = None) -> "list[list[tuple[int, Vertex]]]":
+        """Finds the :ref:`Like Vertex Pairs <like-vertex-pair-ref>` of every template whose start vertex star is present in a molecule.
+
+            Each molecular vertex descends the tree once, so the stars shared between templates are checked once.
+            The pruned pairs can never be matched by a search, so the matches of a molecule are unchanged.
+
+            Parameters
+            ----------
+            matcher : Matcher
+                The matching backend of the organic molecule, which holds its keyed incident edges
+
+            screened : Sequence[bool] | None
+                Whether each template by template position may be present in the molecule, where templates
+                which failed the screen get no start pairs (every template is searched when None)
+
+            Returns
+            -------
+            list[list[tuple[int, Vertex]]]
+                The (functional group vertex index, molecular vertex) start pairs of each template by template position, 
+                in functional group vertex then molecular vertex order
+        """
+
+        start_pairs: "list[list[tuple[int, Vertex]]]" = [[] for _ in range(self.template_count)]
+
+        ##### Molecular Vertex Loop #####
+        for mol_vertex in matcher.mol.vertices:
+            root = self.roots.get((mol_vertex.symbol, mol_vertex.total_degree))
+            if root is None:
+                continue
+            key_counts = Counter(edge[2] for edge in matcher.neighbors[mol_vertex.index])
+            implicit_degree = mol_vertex.implicit_degree
+
+            ##### Tree Descent #####
+            nodes = [root]
+            while nodes:
+                children, leaves = nodes.pop()
+                for template_position, fg_index, implicit in leaves:
+                    if (not implicit or implicit_degree >= implicit) and (screened is None or screened[template_position]):
+                        start_pairs[template_position].append((fg_index, mol_vertex))
+                for (key, count), child in children.items():
+                    if key_counts[key] >= count:
+                        nodes.append(child)
+
+        ##### Functional Group Vertex Order #####
+        for template_start_pairs in start_pairs:
+            template_start_pairs.sort(key=itemgetter(0))
+
+        return start_pairs
+
+
+##### Matching Backends #####
+MATCHERS: "dict[str, type[Matcher]]" = {
+    "dfs": DFSMatcher,
+    "vf2": VF2Matcher,
+}
+"""Dictionary of matching backend name to its matcher class"""
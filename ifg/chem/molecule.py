@@ -1,26 +1,26 @@
 """A class for decoding chemical information from the Simplified Molecular Input Line Entry System (SMILES)"""
 
-import csv
 from collections import (
     Counter, 
     defaultdict
 )
+from functools import cached_property
 import itertools
-import os
-from typing import Literal
+from typing import Iterable, Iterator, Literal, NamedTuple
 
 from .vertex import Vertex
 from .edge import Edge
+from .budget import WorkBudget
+from .matching import MATCHERS, Matcher
+from .profiling import StageProfile
+from .templates import FunctionalGroupLibrary, loadFunctionalGroupLibrary
+from .tokens import Token, tokenize
 from .constants import (
     AMINO_ACID_REGEX,
-    ATOM_REGEX,
-    BOND_REGEX,
     CHARGE_REGEX,
-    DIGIT_REGEX,
     ELECTRON_BOND_COUNTS,
-    PARENTH_REGEX,
     REQUIRED_VALENCE_COUNTS,
-    SMILES_REGEX,
+    RING_NOMENCLATURE,
 )
 
 
@@ -39,6 +39,18 @@ class Molecule():
             A name identifier for the molecule or functional group
         type : Literal["mol", "fg"]
             An organic molecule (mol) or functional group (fg) SMILES code
+        ring_perception : Literal["smiles", "graph"]
+            Identify rings from the SMILES code ring digits (smiles) or from the edges of the molecular graph (graph)
+        matcher : Literal["vf2", "dfs"]
+            The functional group sub-graph matching backend, an iterative state-space search (vf2) or the recursive :py:meth:`DFS` (dfs)
+        groups : Iterable[str] | None
+            The functional group template names to identify, with the same counts as identifying every group (every group when None)
+        profile : bool
+            Record the wall time of each stage and the functional group search counters in a :py:class:`profiling.StageProfile`
+        max_steps : int | None
+            The largest number of functional group search steps before :py:class:`budget.BudgetExceeded` is raised (None for no step limit)
+        max_seconds : float | None
+            The largest wall time in seconds before :py:class:`budget.BudgetExceeded` is raised (None for no time limit), see :py:class:`budget.WorkBudget`
 
         Returns
         -------
@@ -55,80 +67,187 @@ class Molecule():
     def __init__(self, 
         smiles: str, 
         name: str = "", 
-        type: Literal["mol", "fg"] = "mol"
+        type: Literal["mol", "fg"] = "mol",
+        ring_perception: Literal["smiles", "graph"] = "smiles",
+        matcher: Literal["vf2", "dfs"] = "vf2",
+        groups: "Iterable[str] | None" = None,
+        profile: bool = False,
+        max_steps: "int | None" = None,
+        max_seconds: "float | None" = None,
     ):
         """ Generates a software molecule graph of any SMILES defined molecule. 
             Generates ring and functional group data for organic molecules
         """
 
+        ##### Stage Instrumentation #####
+        self.profile: "StageProfile | None" = StageProfile() if profile else None
+        """The per-stage wall time and search counters of the molecule, or None when it is not profiled"""
+
+        self.budget: "WorkBudget | None" = WorkBudget(max_steps, max_seconds) if max_steps is not None or max_seconds is not None else None
+        """The search step and wall time budget of the molecule, or None when it is unlimited"""
+
         ##### Input Data #####
-        self.smiles: list[str] = SMILES_REGEX.findall(smiles)
-        """The list of all smiles code symbols, with charges attached to atoms as needed, according to the SMILES_REGEX capture groups"""
+        self.tokens: list[Token] = tokenize(smiles)
+        """The list of all classified smiles code symbols, tokenized once and consumed by every graph-building stage"""
+
+        self.smiles: list[str] = [token.symbol for token in self.tokens]
+        """The list of all smiles code symbols, with charges attached to atoms as needed, according to the TOKEN_REGEX capture groups"""
 
-        self.atoms: list[str] = ATOM_REGEX.findall(smiles)
-        """The list of all smiles code atoms, inclusive of charges, according to the ATOM_REGEX capture groups"""
+        self.atoms: list[str] = [token.symbol for token in self.tokens if token.kind == "atom"]
+        """The list of all smiles code atoms, inclusive of charges, according to the TOKEN_REGEX atom capture group"""
 
         self.name: str = name
         """The name identifier for the smiles code"""
 
+        self.matcher: str = matcher
+        """The name of the functional group sub-graph matching backend, a key of :py:data:`matching.MATCHERS`"""
+
         assert ['[', ']'] not in self.atoms
+        if self.profile:
+            self.profile.lap("tokenize")
 
         ##### Software Molecule Graph (Graph Theory) #####
         self.vertices: "list[Vertex]" = self.createVertices()
         """The list of vertices of the molecular graph"""
+        if self.profile:
+            self.profile.lap("createVertices")
 
         self.order: int = len(self.vertices)
         """The number of vertices of the molecular graph"""
 
+        self.adjacency: "list[list[Edge]]" = [[] for _ in self.vertices]
+        """The incident edges of each vertex of the molecular graph by vertex index, in ascending edge index order"""
+
         self.edges: "list[Edge]" = self.createEdges()
         """The list of edges of the molecular graph"""
+        if self.profile:
+            self.profile.lap("createEdges")
+        if self.budget:
+            self.budget.check("createEdges")
 
         self.size: int = len(self.edges)
         """The number of edges of the molecular graph"""
 
         assert self.order == len(self.atoms)
 
-        ##### Ring Data #####
-        self.ring_atoms: set[int]
+        ##### Lazy Ring Data #####
+        self.ring_perception: str = ring_perception
+        """The ring perception algorithm run on first access of the ring data, the SMILES code ring identifiers (smiles) or the graph (graph)"""
+
+        ##### Atom Counts #####
+        self.atom_freq: dict[str, int] = Counter([v.symbol for v in self.vertices])
+        """The frequency of each atom in the molecule"""
+
+        self.bond_freq: dict[str, int] = Counter([e.bond_type for e in self.edges])
+        """The frequency of each bond type in the molecule"""
+    
+        ##### Miscellaneous Molecular Data #####
+        self.amino_acid: bool = len(AMINO_ACID_REGEX.findall(smiles)) != 0 
+        """The assertion of a present amino acid in the molecule"""
+
+        ##### Lazy Functional Groups #####
+        self.type: str = type
+        """The type of molecule, where only organic molecules ("mol") have their functional groups identified on first access"""
+
+        self.groups: "frozenset[str] | None" = None if groups is None else frozenset(groups)
+        """The functional group template names to identify, or None to identify every functional group"""
+
+        self._skipped_templates: list[str] = []
+        """The names of the functional group templates skipped by the last functional group identification"""
+
+    ##### Lazy Ring Data Properties #####
+    @cached_property
+    def ring_data(self) -> "tuple[set[int], int, int]":
+        """The (ring atom indices, aromatic ring count, non aromatic ring count) of the molecule, perceived once on first access, 
+        which also sets the ring types of the vertices"""
+        if self.profile:
+            self.profile.start()
+        ring_data = self.createRings() if self.ring_perception == "smiles" else self.createGraphRings()
+        if self.profile:
+            self.profile.lap("createRings")
+        if self.budget:
+            self.budget.check("createRings")
+        return ring_data
+
+    @property
+    def ring_atoms(self) -> "set[int]":
         """The vertex indices which are apart of a ring structure"""
+        return self.ring_data[0]
 
-        self.aromatic_ring_count: int
+    @property
+    def aromatic_ring_count(self) -> int:
         """The number of aromatic rings in the molecule"""
+        return self.ring_data[1]
 
-        self.non_aromatic_ring_count: int
+    @property
+    def non_aromatic_ring_count(self) -> int:
         """The number of non aromatic rings in the molecule"""
+        return self.ring_data[2]
 
-        self.ring_atoms, self.aromatic_ring_count, self.non_aromatic_ring_count = self.createRings()
-
-        self.total_ring_count: int = self.aromatic_ring_count + self.non_aromatic_ring_count
+    @property
+    def total_ring_count(self) -> int:
         """The total number of rings in the molecule"""
+        return self.aromatic_ring_count + self.non_aromatic_ring_count
 
-        self.total_ring_atom_count: int = len(self.ring_atoms)
+    @property
+    def total_ring_atom_count(self) -> int:
         """The total number of atoms apart of rings in the molecule"""
+        return len(self.ring_atoms)
 
-        self.total_aromatic_atoms: int = len([symbol for symbol in self.atoms if symbol.islower()])
+    @property
+    def total_aromatic_atoms(self) -> int:
         """The total number of aromatic atoms in the molecule"""
+        return len([symbol for symbol in self.atoms if symbol.islower()])
 
-        self.total_non_aromatic_atoms: int = self.total_ring_atom_count-self.total_aromatic_atoms
+    @property
+    def total_non_aromatic_atoms(self) -> int:
         """The total number of non aromatic atoms in the molecule"""
-    
-        ##### Atom Counts #####
-        self.atom_freq: dict[str, int] = Counter([v.symbol for v in self.vertices])
-        """The frequency of each atom in the molecule"""
-    
-        ##### Miscellaneous Molecular Data #####
-        self.amino_acid: bool = len(AMINO_ACID_REGEX.findall(smiles)) != 0 
-        """The assertion of a present amino acid in the molecule"""
+        return self.total_ring_atom_count-self.total_aromatic_atoms
 
-        ##### Functional Groups #####
-        self.functional_groups_all: dict[str, int]
+    ##### Lazy Functional Group Properties #####
+    @cached_property
+    def functional_groups(self) -> "tuple[dict[str, int], dict[str, int]]":
+        """The (inclusive, exclusive of overlapped) functional group frequencies of the molecule, identified once on first access 
+        (empty for functional group type molecules)"""
+        return self.createFunctionalGroups() if self.type == "mol" else ({}, {})
+
+    @property
+    def functional_groups_all(self) -> "dict[str, int]":
         """The frequency of each functional group inclusive of overlapped functional groups"""
+        return self.functional_groups[0]
 
-        self.functional_groups_exact: dict[str, int]
+    @property
+    def functional_groups_exact(self) -> "dict[str, int]":
         """The frequency of each functional group exclusive of overlapped functional groups"""
-        
-        self.functional_groups_all, self.functional_groups_exact = self.createFunctionalGroups() if type == "mol" else ({}, {})
+        return self.functional_groups[1]
+
+    @property
+    def skipped_templates(self) -> "list[str]":
+        """The names of the functional group templates skipped without a graph search because the molecule lacks their atoms or bonds"""
+        self.functional_groups
+        return self._skipped_templates
 
+    def result(self) -> "MoleculeResult":
+        """Collects the final ring, amino acid and functional group numbers of the molecule into a slim result record.
+
+            The record holds no reference to the molecular graph, so the molecule can be released once it is created.
+            Computes the ring data and functional groups when they have not been accessed yet.
+
+            Returns
+            -------
+            MoleculeResult
+                The result record of the molecule
+        """
+        return MoleculeResult(
+            self.name,
+            self.aromatic_ring_count,
+            self.non_aromatic_ring_count,
+            self.amino_acid,
+            dict(self.functional_groups_all),
+            dict(self.functional_groups_exact),
+            len(self.skipped_templates),
+            self.profile.asDict() if self.profile else None,
+        )
 
     def createVertices(self) -> "list[Vertex]":
         """Creates the vertices of a software molecule graph using a hydrogen-suppressed SMILES code.
@@ -192,8 +311,8 @@ class Molecule():
     def createEdges(self) -> "list[Edge]":
         """Creates the edges and the vertex degrees of a software molecule graph using a hydrogen-suppressed SMILES code.
         
-            Creates an edge object for every bond between two atomic symbols 
-            and computes the hidden hydrogen count for each vertex. 
+            Creates an edge object for every bond between two atomic symbols, indexes each edge
+            under both of its vertices in :py:attr:`adjacency`, and computes the hidden hydrogen count for each vertex. 
 
             Returns
             -------
@@ -225,38 +344,42 @@ class Molecule():
         edges: "list[Edge]" = []
         
         ##### Algorithm Implementation #####
-        for i,symbol in enumerate(self.smiles[1:]):
+        for i in range(1, len(self.tokens)):
+            kind, symbol, atom_index = self.tokens[i]
 
             ##### Atom Symbol Case #####
-            if ATOM_REGEX.match(symbol):
-                atom_index+=1
-                edge_atoms = [self.vertices[match_index], self.vertices[atom_index]]
+            if kind == "atom":
+                edge_atoms = (self.vertices[match_index], self.vertices[atom_index])
                 new_edge = Edge(edge_atoms, bond, edge_index)
                 edge_index+=1
                 edges.append(new_edge)
+                self.adjacency[match_index].append(new_edge)
+                self.adjacency[atom_index].append(new_edge)
                 match_index = atom_index
                 bond = ""
 
             ##### Bond Symbol Case #####
-            if BOND_REGEX.match(symbol):
+            elif kind == "bond":
                 bond = symbol               # type: ignore
 
             ##### Digit Symbol Case #####
-            if DIGIT_REGEX.match(symbol):
+            elif kind == "digit":
                 if symbol in open_ring_table:
                     ring_atom_index = open_ring_table.pop(symbol)
-                    edge_atoms = [self.vertices[ring_atom_index], self.vertices[atom_index]]
+                    edge_atoms = (self.vertices[ring_atom_index], self.vertices[atom_index])
                     new_edge = Edge(edge_atoms, "", edge_index)
                     edge_index+=1
                     edges.append(new_edge)
+                    self.adjacency[ring_atom_index].append(new_edge)
+                    self.adjacency[atom_index].append(new_edge)
                 else:
                     open_ring_table[symbol] = atom_index 
 
             ##### Parenthesis Symbol Case #####
-            if PARENTH_REGEX.match(symbol):
+            else:
                 if symbol == '(':    
                     # double parenthetical groups [i.e. C(C)(C)] will re-append the match index 
-                    if self.smiles[1:][i-1] == ')':
+                    if self.tokens[i-1].symbol == ')':
                         parenth_start_atom_stack.append(match_index)
                     else:
                         parenth_start_atom_stack.append(atom_index)
@@ -281,7 +404,7 @@ class Molecule():
                 continue
 
             ##### Core Vertex Degree #####
-            total_edges = [edge for edge in edges if vertex.index in edge.indices]
+            total_edges = self.adjacency[vertex.index]
             explicit_valence_electrons = sum([ELECTRON_BOND_COUNTS[edge.bond_type] for edge in total_edges])        
             implicit_valence_electrons = vertex.valence_electrons_required - explicit_valence_electrons            # number of hydrogens
             vertex.explicit_degree = len(total_edges)
@@ -331,10 +454,10 @@ class Molecule():
         ring_info: dict[int, list[int]] = {}
 
         ##### Preparation Implementation #####
-        for symbol in self.smiles[1:]:
+        for kind, symbol, _ in self.tokens[1:]:
 
             ##### Digit Symbol Case #####
-            if DIGIT_REGEX.match(symbol):
+            if kind == "digit":
 
                 if symbol in open_ring_table:
                     open_ring_table.pop(symbol)
@@ -345,7 +468,7 @@ class Molecule():
                     ring_index+=1
 
             ##### Parenthesis Symbol Case #####
-            if PARENTH_REGEX.match(symbol):
+            elif kind == "parenth":
 
                 if symbol == '(':
                     p_group_counter+=1
@@ -377,11 +500,10 @@ class Molecule():
         ring_atom_indices: set[int] = set()
 
         ##### Algorithm Implementation #####
-        for symbol in self.smiles[1:]:
+        for kind, symbol, atom_index in self.tokens[1:]:
 
             ##### Atom Symbol Case #####
-            if ATOM_REGEX.match(symbol):
-                atom_index+=1
+            if kind == "atom":
 
                 if open_ring_table:
 
@@ -392,7 +514,7 @@ class Molecule():
                         ring_set[ring_stack[-1]].append(atom_index)
 
             ##### Digit Symbol Case #####
-            if DIGIT_REGEX.match(symbol):
+            elif kind == "digit":
 
                 if symbol in open_ring_table:
 
@@ -413,15 +535,11 @@ class Molecule():
                     ring_index+=1
                 
                 ring_stack = list(open_ring_table.values())
-                ring_p_groups = set(
-                    itertools.chain.from_iterable(
-                        [p_groups for ring_idx, p_groups in ring_info.items() if ring_idx in open_ring_table.values()]
-                    )
-                )
+                ring_p_groups = set(itertools.chain.from_iterable(ring_info[ring_idx] for ring_idx in ring_stack))
 
 
             ##### Parenthesis Symbol Case #####
-            if PARENTH_REGEX.match(symbol):
+            elif kind == "parenth":
 
                 if symbol == '(':
                     p_group_counter+=1
@@ -469,6 +587,149 @@ class Molecule():
         )
 
 
+    def createGraphRings(self):
+        """ Creates the rings of the software molecule graph from its edges by identifying them with graph theory.
+
+            Determines the number of aromatic and non-aromatic rings, and distinguishes all atoms 
+            as aromatic, non-aromatic, or non-cyclic in linear time, without re-reading the SMILES code.
+            Finds the same total number of rings and the same atom ring types as :py:meth:`molecule.Molecule.createRings`, 
+            which remains selectable with ``ring_perception="smiles"`` for validation, but the split of the rings into aromatic 
+            and non-aromatic rings can differ. :py:meth:`molecule.Molecule.createRings` only adds an atom to the most recently 
+            opened ring, so a ring whose non-aromatic atoms are written while a later ring is open (such as the CH2 bridged 
+            five-membered ring of ``c1ccc2c(c3ccc4c5c(Cc4c3C2)cccc5)c1``) is given only its aromatic atoms and counted as aromatic, 
+            while this method counts a ring as aromatic only when it closes through aromatic atoms alone 
+            (3 aromatic and 2 non-aromatic rings here, against 4 and 1).
+
+            Returns
+            -------
+            None
+
+            Notes
+            -----
+            The ring atoms are the vertices of every edge which is not a bridge, where a bridge is an edge that belongs to no cycle. 
+            Bridges are found with an iterative depth first search that compares the discovery order of each vertex with the 
+            lowest discovery order reachable from its search subtree (Tarjan's bridge-finding algorithm). The number of rings 
+            is the cycle rank of the molecular graph (its number of smallest independent rings), counted with a disjoint-set forest 
+            as the number of edges that join two already connected vertices. The number of aromatic rings is the cycle rank 
+            of the sub-graph of edges between aromatic vertices, and every other ring is non-aromatic.
+
+            | `Algorithm Variables Reference`
+            | ``discovery``               (list[int]):            the depth first search discovery order of each vertex (-1 when undiscovered)
+            | ``low``                     (list[int]):            the lowest discovery order reachable from the search subtree of each vertex
+            | ``search_stack``            (list[tuple]):          a stack of (vertex index, tree edge index, incident edge iterator) for the open search path
+            | ``ring_set``                (list[int]):            a disjoint-set forest of vertex indices for all edges
+            | ``aromatic_ring_set``       (list[int]):            a disjoint-set forest of vertex indices for edges between aromatic vertices
+            | ``ring_atom_indices``       (set[int]):             the set of atom indices apart of rings (aromatic or non-aromatic)
+            | ``aromatic_ring_count``     (int):                  the number of aromatic rings
+            | ``non_aromatic_ring_count`` (int):                  the number of non-aromatic rings 
+        """
+
+        ########## Ring Atoms ##########
+
+        ##### Bridge Search Variables #####
+        discovery: list[int] = [-1]*self.order
+        low: list[int] = [0]*self.order
+        order_counter: int = 0
+        ring_atom_indices: set[int] = set()
+
+        ##### Bridge Search Implementation #####
+        for root_index in range(self.order):
+
+            ##### Discovered Vertex Case #####
+            if discovery[root_index] != -1:
+                continue
+
+            ##### Search Tree Root #####
+            discovery[root_index] = low[root_index] = order_counter
+            order_counter+=1
+            search_stack: list[tuple[int, int, Iterator[Edge]]] = [(root_index, -1, iter(self.adjacency[root_index]))]
+
+            ##### Iterative Depth First Search #####
+            while search_stack:
+                vertex_index, tree_edge_index, incident_edges = search_stack[-1]
+
+                ##### Incident Edges Loop #####
+                for edge in incident_edges:
+                    if edge.index == tree_edge_index:
+                        continue
+                    neighbor_index = edge.complement_vertex(vertex_index).index
+
+                    ##### Tree Edge Case #####
+                    if discovery[neighbor_index] == -1:
+                        discovery[neighbor_index] = low[neighbor_index] = order_counter
+                        order_counter+=1
+                        search_stack.append((neighbor_index, edge.index, iter(self.adjacency[neighbor_index])))
+                        break
+
+                    ##### Back Edge Case #####
+                    low[vertex_index] = min(low[vertex_index], discovery[neighbor_index])
+
+                ##### Finished Vertex Case #####
+                else:
+                    search_stack.pop()
+                    if search_stack:
+                        parent_index = search_stack[-1][0]
+                        low[parent_index] = min(low[parent_index], low[vertex_index])
+
+                        ##### Non-Bridge Tree Edge #####
+                        if low[vertex_index] <= discovery[parent_index]:
+                            ring_atom_indices.add(parent_index)
+                            ring_atom_indices.add(vertex_index)
+
+        ########## Ring Counts ##########
+
+        ##### Cycle Rank Variables #####
+        ring_set: list[int] = list(range(self.order))
+        aromatic_ring_set: list[int] = list(range(self.order))
+        total_ring_count: int = 0
+        aromatic_ring_count: int = 0
+
+        ##### Cycle Rank Implementation #####
+        for edge in self.edges:
+            vertex_a, vertex_b = edge.atoms
+
+            ##### All Rings Disjoint-Set Union #####
+            root_a, root_b = vertex_a.index, vertex_b.index
+            while ring_set[root_a] != root_a:
+                ring_set[root_a] = ring_set[ring_set[root_a]]
+                root_a = ring_set[root_a]
+            while ring_set[root_b] != root_b:
+                ring_set[root_b] = ring_set[ring_set[root_b]]
+                root_b = ring_set[root_b]
+            if root_a == root_b:
+                total_ring_count+=1
+            else:
+                ring_set[root_a] = root_b
+
+            ##### Aromatic Rings Disjoint-Set Union #####
+            if vertex_a.ring_type == "aromatic" and vertex_b.ring_type == "aromatic":
+                root_a, root_b = vertex_a.index, vertex_b.index
+                while aromatic_ring_set[root_a] != root_a:
+                    aromatic_ring_set[root_a] = aromatic_ring_set[aromatic_ring_set[root_a]]
+                    root_a = aromatic_ring_set[root_a]
+                while aromatic_ring_set[root_b] != root_b:
+                    aromatic_ring_set[root_b] = aromatic_ring_set[aromatic_ring_set[root_b]]
+                    root_b = aromatic_ring_set[root_b]
+                if root_a == root_b:
+                    aromatic_ring_count+=1
+                else:
+                    aromatic_ring_set[root_a] = root_b
+
+        ########## Algorithm Collection ##########
+
+        ##### Atom Ring Types #####
+        for atom_index in ring_atom_indices:
+            if self.vertices[atom_index].ring_type == "non-cyclic":
+                self.vertices[atom_index].ring_type = "non-aromatic"
+
+        ##### Collection Results #####
+        return (
+            ring_atom_indices,
+            aromatic_ring_count,
+            total_ring_count - aromatic_ring_count,
+        )
+
+
     def createFunctionalGroups(self):
         """Determine the frequency of the unique ring classified functional groups given a list of identifiable functional groups using the software molecule graph format.
         
@@ -490,87 +751,121 @@ class Molecule():
                 Only "mol" type given in constructor calls this function
 
             | `Algorithm Variables Reference`
-            | ``all_fgs``                 (list[Molecule]):             a list of all functional group matches under the Molecule class type, hierarchically filtered
-            | ``fg``                      (Molecule):                   a functional group graph template built from its hydrogen-suppressed SMILES code
+            | ``all_fgs``                 (list[FunctionalGroupMatch]): a list of all functional group match records, hierarchically filtered
+            | ``fg``                      (Molecule):                   a compiled functional group graph template shared by every molecule, see :py:func:`templates.loadFunctionalGroupLibrary`
             | ``fg_matches``              (list[dict[int,int]]):        a list of ``matched_indices`` results from the DFS algorithm 
-            | ``like_vertex_pairs``       (dict[int, list[Vertex]]):    a dicitonary of *core* functional group vertex index to all :ref:`Like Vertex Paired <like-vertex-pair-ref>` organic molecule vertex indices
-            | ``fg_vertex``               (Vertex):                     a *core* functional group vertex which will begin the DFS algorithm
-            | ``fg_match``                (Molecule):                   a Molecule generated functional group match with overwritten :ref:`Like Vertex Paired <like-vertex-pair-ref>` organic moleulce vertex indices
-            | ``exact_fgs``               (list[int]):                  a list of matches after ``all_fgs`` is overlap filtered
+            | ``fg_match_keys``           (set[frozenset[int]]):        the matched organic molecule vertex indices of each of the ``fg_matches``, which detects duplicate matches in constant time
+            | ``needed``                  (list[bool]):                 whether each template must be searched for the requested functional groups, see :py:meth:`templates.FunctionalGroupLibrary.closure`
+            | ``screened``                (list[bool]):                 whether each needed template passed the atom and bond composition screen, see :py:meth:`templates.FunctionalGroupTemplate.screen`
+            | ``start_pairs``             (list[list[tuple]]):          the (*core* functional group vertex index, molecule vertex) :ref:`Like Vertex Pairs <like-vertex-pair-ref>` of each template, pruned by the shared :py:class:`matching.DiscriminationTree`
+            | ``ring_type``               (str):                        the ring classification of a match by the ring types of its :ref:`Like Vertex Paired <like-vertex-pair-ref>` organic molecule vertices
+            | ``exact_fgs``               (list[FunctionalGroupMatch]):                  a list of matches after ``all_fgs`` is overlap filtered
         """
 
+        ##### Vertex Ring Types #####
+        self.ring_data
+        if self.profile:
+            self.profile.start()
+
         ##### All Functional Group Matches #####
-        all_fgs: list[Molecule] = []
+        all_fgs: list[FunctionalGroupMatch] = []
+
+        ##### Requested Functional Groups Closure #####
+        library: FunctionalGroupLibrary = loadFunctionalGroupLibrary()
+        needed: list[bool] = library.closure(self.groups) if self.groups is not None else [True]*len(library)
+
+        ##### Functional Group Atom & Bond Composition Screen #####
+        screened: list[bool] = [needed_template and template.screen(self.atom_freq, self.bond_freq) for template, needed_template in zip(library, needed)]
+        self._skipped_templates = [template.name for template, needed_template, passed in zip(library, needed, screened) if needed_template and not passed]
+        if self.profile:
+            self.profile.lap("screen")
 
-        ##### Functional Groups Smiles Codes CSV File #####
-        functional_group_smiles_codes_csv_file = open(os.path.dirname(__file__) + "/data/functional_group_smiles_codes.csv")
+        ##### Functional Group Sub-Graph Matching Backend (not built when every template is skipped) #####
+        matcher: "Matcher | None" = MATCHERS[self.matcher](self) if any(screened) else None
+
+        ##### Functional Group Mol Vertex Start Locations #####
+        start_pairs: list[list[tuple[int, Vertex]]] = library.startTree(self.groups).startPairs(matcher, screened) if matcher else [[] for _ in library]
+        if self.profile:
+            self.profile.lap("startPairs")
+        if self.budget:
+            self.budget.check("startPairs")
 
         ##### Functional Group Loop #####
-        for (fg_smiles, fg_name) in csv.reader(functional_group_smiles_codes_csv_file, delimiter=",", skipinitialspace=True):
+        for template_position, (template, passed, fg_start_pairs) in enumerate(zip(library, screened, start_pairs)):
 
-            ##### Functional Group Graph Template #####
-            fg: Molecule = Molecule(fg_smiles, fg_name, "fg")
+            ##### Skipped Functional Group Case #####
+            if not passed:
+                continue
+            if self.budget:
+                matcher.checkBudget()
 
             ##### Functional Group Matches #####
+            fg: Molecule = template.graph
             fg_matches: list[dict[int,int]] = []
-
-            ##### Functional Group Mol Vertex Start Locations #####
-            like_vertex_pairs: dict[int, list[Vertex]] = {
-                fg_vertex.index: [
-                    mol_vertex for mol_vertex in self.vertices 
-                    if mol_vertex.symbol == fg_vertex.symbol and 
-                    mol_vertex.total_degree == fg_vertex.total_degree
-                ]
-                for fg_vertex in fg.vertices if fg_vertex.symbol != 'R'
-            }
+            fg_match_keys: set[frozenset[int]] = set()
+            fg_core_size: int = len([vertex for vertex in fg.vertices if vertex.symbol != 'R'])
 
             ##### Functional Group Mol Vertex Start Locations Loop #####
-            for fg_vertex_index, matched_mol_vertices in like_vertex_pairs.items():
-
-                ##### Functional Group Start Vertex #####
-                fg_vertex: Vertex = fg.vertices[fg_vertex_index]
+            for fg_vertex_index, mol_vertex in fg_start_pairs:
 
-                ##### Molecule Start Vertex Locations Loop #####
-                for mol_vertex in matched_mol_vertices:
+                ##### Functional Group Sub-Graph Match Algorithm #####
+                fg_matched_atoms: dict[int, int] = matcher.match(fg, fg.vertices[fg_vertex_index], mol_vertex)
 
-                    ##### Functional Group DFS Match Algorithm #####
-                    fg_matched_atoms, _, _ = self.DFS(fg, fg_vertex, mol_vertex, [], [])
+                ##### Functional Group Match Case #####
+                if len(fg_matched_atoms) == fg_core_size:
 
-                    ##### Functional Group Match Case #####
-                    if (
-                        len(fg_matched_atoms) == len([vertex for vertex in fg.vertices if vertex.symbol != 'R'])
-                        and
-                        not set(fg_matched_atoms.values()) in [set(match.values()) for match in fg_matches]
-                    ):
-                        ##### Unique Matched Functional Group Add ##### 
+                    ##### Unique Matched Functional Group Add (keyed by its matched mol vertex indices) ##### 
+                    fg_match_key: frozenset[int] = frozenset(fg_matched_atoms.values())
+                    if fg_match_key not in fg_match_keys:
+                        fg_match_keys.add(fg_match_key)
                         fg_matches.append(fg_matched_atoms)
 
 
-            ##### Functional Group Molecular Object Creations #####
+            ##### Functional Group Match Records #####
             for fg_matched_atoms in fg_matches:
-                
-                ##### Functional Group Extraction #####
-                fg_match: Molecule = Molecule(fg_smiles, fg_name, "fg")
-                for (fg_atom_index, om_atom_index) in fg_matched_atoms.items():
-                    fg_match.vertices[fg_atom_index].index = self.vertices[om_atom_index].index
-                    fg_match.vertices[fg_atom_index].ring_type = self.vertices[om_atom_index].ring_type
 
                 ##### Ring Classification #####
-                aromatic_tally: int = len([fg_vertex for fg_vertex in fg_match.vertices if fg_vertex.symbol != 'R' and fg_vertex.ring_type == "aromatic"])
-                non_aromatic_tally: int = len([fg_vertex for fg_vertex in fg_match.vertices if fg_vertex.symbol != 'R' and fg_vertex.ring_type == "non-aromatic"])
-                if aromatic_tally != 0 or non_aromatic_tally != 0:
-                    nomenclature: str = "Aromatic " if aromatic_tally >= non_aromatic_tally else "Non Aromatic "
-                    fg_match.name = nomenclature + fg_match.name
-                
-                ##### Match Add #####                        
-                all_fgs.append(fg_match)
+                ring_types: list[str] = [self.vertices[om_atom_index].ring_type for om_atom_index in fg_matched_atoms.values()]
+                aromatic_tally: int = ring_types.count("aromatic")
+                non_aromatic_tally: int = ring_types.count("non-aromatic")
+                ring_type: str = (
+                    "non-cyclic" if aromatic_tally == 0 and non_aromatic_tally == 0 else
+                    "aromatic" if aromatic_tally >= non_aromatic_tally else 
+                    "non-aromatic"
+                )
 
+                ##### Match Add #####
+                all_fgs.append(FunctionalGroupMatch(
+                    template_position,
+                    RING_NOMENCLATURE[ring_type] + template.name,
+                    tuple(fg_matched_atoms.items()),
+                    ring_type,
+                    frozenset(fg_matched_atoms.values()),
+                    template.core_edges,
+                ))
+
+
+        ##### Search Counters #####
+        if self.profile:
+            self.profile.lap("match")
+            self.profile.counters.update(
+                dfs_calls=matcher.searches if matcher else 0,
+                search_states=matcher.states if matcher else 0,
+                candidate_pairs=matcher.candidates if matcher else 0,
+                matches=len(all_fgs),
+            )
 
         ##### Hierarchical Functional Group Filter #####
-        all_fgs: list[Molecule] = self.hierarchyFilter(all_fgs)
+        match_count: int = len(all_fgs)
+        all_fgs: list[FunctionalGroupMatch] = self.hierarchyFilter(all_fgs)
+        if self.profile:
+            self.profile.lap("hierarchyFilter")
 
         ##### Overlapping Functional Group Filter #####
-        exact_fgs: list[Molecule] = self.overlapFilter(all_fgs)
+        exact_fgs: list[FunctionalGroupMatch] = self.overlapFilter(all_fgs)
+        if self.profile:
+            self.profile.lap("overlapFilter")
+            self.profile.counters.update(hierarchy_filtered=match_count-len(all_fgs), overlap_filtered=len(all_fgs)-len(exact_fgs))
 
         ##### All Functional Group Counts #####
         all_fgs_dict = defaultdict(int)
@@ -582,6 +877,12 @@ class Molecule():
         for fg in exact_fgs:
             exact_fgs_dict[fg.name] += 1
 
+        ##### Requested Functional Group Counts #####
+        if self.groups is not None:
+            requested_columns = set(library.groupColumns(self.groups))
+            all_fgs_dict = defaultdict(int, {name: count for name, count in all_fgs_dict.items() if name in requested_columns})
+            exact_fgs_dict = defaultdict(int, {name: count for name, count in exact_fgs_dict.items() if name in requested_columns})
+
         ##### Algorithm Results #####
         return (all_fgs_dict, exact_fgs_dict)
 
@@ -590,7 +891,8 @@ class Molecule():
         fg_vertex: Vertex, 
         mol_vertex: Vertex, 
         used_mol_edges: "list[int]", 
-        used_fg_edges: "list[int]"
+        used_fg_edges: "list[int]",
+        matcher: "Matcher | None" = None,
     ) -> 'tuple[dict[int, int], list[int], list[int]]':
         """Searches an organic molecule software graph for the presence of a functional group sub-graph using a recursive depth first search and backtracking algorithm.
         
@@ -611,6 +913,9 @@ class Molecule():
             used_fg_edges
                 The list of functional group edge indices that have already been paired with molecular edges
 
+            matcher : Matcher | None
+                The matching backend which counts each call as a search state and checks the work budget of the molecule with it
+
             Returns
             -------
             matched_path_atoms: dict[int, int]
@@ -637,12 +942,18 @@ class Molecule():
             | ``matched_fg_path_edges``   (list[int]):            a backtracking-cumulative version of ``used_fg_edges``
         """
 
+        ##### Search State Count & Work Budget #####
+        if matcher:
+            matcher.states+=1
+            if matcher.states >= matcher.step_limit:
+                matcher.checkBudget()
+
         ##### New Atom-Pair Backtrack Variable #####
         matched_indices = {fg_vertex.index: mol_vertex.index}
 
         ##### Edge Sets #####
-        fg_core_edges = [edge for edge in fg.edges if fg_vertex.index in edge.indices and not edge.index in used_fg_edges and not 'R' in edge.symbols]
-        om_edges = [edge for edge in self.edges if mol_vertex.index in edge.indices and not edge.index in used_mol_edges]
+        fg_core_edges = [edge for edge in fg.adjacency[fg_vertex.index] if not edge.index in used_fg_edges and not 'R' in edge.symbols]
+        om_edges = [edge for edge in self.adjacency[mol_vertex.index] if not edge.index in used_mol_edges]
 
         ##### Implicit Degree Validation #####
         if fg_vertex.implicit_degree != 0 and mol_vertex.implicit_degree < fg_vertex.implicit_degree:
@@ -675,7 +986,7 @@ class Molecule():
                     ):
 
                         ##### DFS Recursion #####
-                        path = self.DFS(fg, fg_complement_vertex, om_corresponding_vertex, used_mol_edges + [om_edge.index], used_fg_edges + [fg_edge.index])
+                        path = self.DFS(fg, fg_complement_vertex, om_corresponding_vertex, used_mol_edges + [om_edge.index], used_fg_edges + [fg_edge.index], matcher)
 
                         ##### Backtrack Collection #####
                         if all(path):
@@ -705,7 +1016,7 @@ class Molecule():
         ##### All Functional Group Core Edges Satisfied #####
         return (matched_indices, used_mol_edges, used_fg_edges)
 
-    def hierarchyFilter(self, all_fgs: "list[Molecule]") -> "list[Molecule]":
+    def hierarchyFilter(self, all_fgs: "list[FunctionalGroupMatch]") -> "list[FunctionalGroupMatch]":
         """Identifies and filters hierarchically related functional group matches.
 
             Uses the theory of :ref:`hierarchical-functional-groups-ref` to identify 
@@ -715,51 +1026,47 @@ class Molecule():
 
             Parameters
             ----------
-            all_fgs : list[Molecule]
-                A list of matched molecular functional group objects
+            all_fgs : list[FunctionalGroupMatch]
+                A list of functional group match records
 
             Returns
             -------
-            list[Molecule]
-                A list of matched molecular functional groups filtered hierarchically for the most accurate group
+            list[FunctionalGroupMatch]
+                A list of functional group match records filtered hierarchically for the most accurate group
 
             Notes
             -----
                 View :ref:`hierarchy-filter-implementation-ref` under :ref:`implementation-ref` for algorithm details
 
             | `Algorithm Variables Reference`
+            | ``signature_groups``  (dict[tuple, list[int]]):   the index positions in ``all_fgs`` of each core signature (see :py:attr:`FunctionalGroupMatch.core_signature`)
             | ``eval_indices``  (list[int]):   a list of index positions in ``all_fgs`` where hierarchical functional groups are
             | ``skip_indices``  (list[int]):   a list of index positions to remove from ``all_fgs``
         
         """
 
-        ##### Matches List Evaluation Indices #####
-        eval_indices: set[int] = set()
-
-        ##### Hierarchical Functional Group Identification #####
+        ##### Core Signature Groups #####
+        signature_groups: defaultdict[tuple, list[int]] = defaultdict(list)
         for i, fg in enumerate(all_fgs):
-            for j, fg_compare in enumerate(all_fgs):
-                if i == j:
-                    continue
-                if (
-                    set([edge for edge in fg.edges if not 'R' in edge.symbols]) == set([edge for edge in fg_compare.edges if not 'R' in edge.symbols]) 
-                    and 
-                    set([fg_vertex.index for fg_vertex in fg.vertices if 'R' not in fg_vertex.symbol]) == set([fg_vertex.index for fg_vertex in fg_compare.vertices if 'R' not in fg_vertex.symbol])
-                ):
-                    eval_indices.add(i)
-                    eval_indices.add(j)
+            signature_groups[fg.core_signature].append(i)
+
+        ##### Hierarchical Functional Group Identification (groups of matches with the same core atoms and bonds) #####
+        eval_indices: list[int] = [i for group in signature_groups.values() if len(group) > 1 for i in group]
         
         ##### Indices To-Be Skipped From Matches List #####
         skip_indices: set[int] = set()
 
         ##### Hierarchical Accuracy Selection #####
+        library: FunctionalGroupLibrary = loadFunctionalGroupLibrary()
         for i in eval_indices:
-            fg: Molecule = all_fgs[i]
-            for core_atom in [fg_vertex for fg_vertex in fg.vertices if fg_vertex.symbol != 'R']:
+            if self.budget:
+                self.budget.check("hierarchyFilter")
+            fg_vertices: list[Vertex] = library.templates[all_fgs[i].template].graph.vertices
+            for (fg_atom_index, om_atom_index) in all_fgs[i].atoms:
                 if (
-                    core_atom.explicit_degree == self.vertices[core_atom.index].explicit_degree 
+                    fg_vertices[fg_atom_index].explicit_degree == self.vertices[om_atom_index].explicit_degree 
                     and 
-                    core_atom.implicit_degree == self.vertices[core_atom.index].implicit_degree
+                    fg_vertices[fg_atom_index].implicit_degree == self.vertices[om_atom_index].implicit_degree
                 ):
                     continue
                 else:
@@ -769,7 +1076,7 @@ class Molecule():
         ##### Apply Skips For Accurate Results #####
         return [fg for i, fg in enumerate(all_fgs) if not i in skip_indices]
         
-    def overlapFilter(self, all_fgs: "list[Molecule]") -> "list[Molecule]":
+    def overlapFilter(self, all_fgs: "list[FunctionalGroupMatch]") -> "list[FunctionalGroupMatch]":
         """Identifies and filters overlapping functional group matches.
         
             Uses the theory of :ref:`overlapping-functional-groups-ref` to identify and remove 
@@ -778,29 +1085,52 @@ class Molecule():
 
             Parameters
             ----------
-            all_fgs : list[Molecule]
-                A list of matched molecular functional group objects
+            all_fgs : list[FunctionalGroupMatch]
+                A list of functional group match records
 
             Returns
             -------
-            list[Molecule]
-                A list of matched molecular functional groups with overlapped functional group occurences removed
+            list[FunctionalGroupMatch]
+                A list of functional group match records with overlapped functional group occurences removed
 
+            Notes
+            -----
+                View :ref:`overlap-filter-implementation-ref` under :ref:`implementation-ref` for algorithm details
+
+            | `Algorithm Variables Reference`
+            | ``cores``  (list[frozenset[int]]):   the core vertex indices of each match in ``all_fgs``
+            | ``size_order``  (list[int]):   the index positions in ``all_fgs`` from the largest to the smallest core
+            | ``atom_matches``  (dict[int, list[int]]):   the index positions of the matches covering each core vertex, from the largest to the smallest core
+            | ``skip_indices``  (list[int]):   a list of index positions to remove from ``all_fgs``
 
         """
 
+        ##### Match Cores & Size Order #####
+        cores: list[frozenset[int]] = [fg.core for fg in all_fgs]
+        size_order: list[int] = sorted(range(len(all_fgs)), key=lambda j: -len(cores[j]))
+
+        ##### Core Vertex Inverted Match Lists #####
+        atom_matches: defaultdict[int, list[int]] = defaultdict(list)
+        for j in size_order:
+            for atom_index in cores[j]:
+                atom_matches[atom_index].append(j)
+
         ##### Indices To-Be Skipped From Matches List #####
         skip_indices: set[int] = set()
 
         ##### Overlapping Functional Group Identification and Accuracy Selection #####
-        for i, fg in enumerate(all_fgs):
-            for fg_compare in all_fgs:
-                if (
-                    len([fg_vertex for fg_vertex in fg.vertices if fg_vertex.symbol != 'R']) < 
-                    len([fg_vertex for fg_vertex in fg_compare.vertices if fg_vertex.symbol != 'R'])
-                ):
-                    if set([fg_vertex.index for fg_vertex in fg.vertices if fg_vertex.symbol != 'R']).issubset(set([fg_vertex.index for fg_vertex in fg_compare.vertices if fg_vertex.symbol != 'R'])):
-                        skip_indices.add(i)
+        for i, core in enumerate(cores):
+            if self.budget:
+                self.budget.check("overlapFilter")
+
+            ##### Larger Matches Sharing The Least Covered Core Vertex #####
+            candidates: list[int] = min((atom_matches[atom_index] for atom_index in core), key=len, default=size_order)
+            for j in candidates:
+                if len(cores[j]) <= len(core):
+                    break
+                if core <= cores[j]:
+                    skip_indices.add(i)
+                    break
 
         ##### Apply Skips For Accurate Results #####
         return [fg for i, fg in enumerate(all_fgs) if not i in skip_indices]
@@ -811,4 +1141,147 @@ class Molecule():
 
     def __repr__(self):
         """General Representation of a Molecule (Same as String Representation)"""
-        return ''.join(self.smiles)
\ No newline at end of file
+        return ''.join(self.smiles)
+
+
+class FunctionalGroupMatch(NamedTuple):
+    """An immutable record of one ring-classified functional group match in an organic molecule.
+
+        Created by :py:meth:`Molecule.createFunctionalGroups` in place of a functional group molecule graph, 
+        the record keeps the template position and atom mapping of the match instead of a graph of its own.
+
+        Parameters
+        ----------
+        template : int
+            The position of the matched template in the functional group library, see :py:func:`templates.loadFunctionalGroupLibrary`
+
+        name : str
+            The ring-classified functional group name of the match
+
+        atoms : tuple[tuple[int, int], ...]
+            The (*core* functional group vertex index, organic molecule vertex index) :ref:`Like Vertex Pairs <like-vertex-pair-ref>` of the match
+
+        ring_type : Literal["aromatic", "non-aromatic", "non-cyclic"]
+            The ring classification of the match by the ring types of its organic molecule vertices
+
+        core : frozenset[int]
+            The organic molecule vertex indices of the *core* vertices of the match
+
+        core_edges : frozenset[tuple[str, str, str]]
+            The structural *core* edges of the matched template, see :py:attr:`templates.FunctionalGroupTemplate.core_edges`
+    """
+
+    template: int
+    name: str
+    atoms: "tuple[tuple[int, int], ...]"
+    ring_type: Literal["aromatic", "non-aromatic", "non-cyclic"]
+    core: "frozenset[int]"
+    core_edges: "frozenset[tuple[str, str, str]]"
+
+    @property
+    def core_signature(self) -> "tuple[frozenset[int], frozenset[tuple[str, str, str]]]":
+        """The (*core* vertex indices, structural *core* edges) of the match, which is shared by every hierarchically related match of the same atoms"""
+        return (self.core, self.core_edges)
+
+
+class MoleculeResult():
+    """A slim record of the final ring, amino acid and functional group numbers of an organic molecule.
+
+        Created by :py:meth:`Molecule.result`, the record keeps none of the molecular graph, tokens or matches,
+        so batches of results do not retain per-molecule graphs.
+
+        Parameters
+        ----------
+        name : str
+            The name identifier of the molecule
+
+        aromatic_ring_count : int
+            The number of aromatic rings in the molecule
+
+        non_aromatic_ring_count : int
+            The number of non aromatic rings in the molecule
+
+        amino_acid : bool
+            The assertion of a present amino acid in the molecule
+
+        functional_groups_all : dict[str, int]
+            The frequency of each functional group inclusive of overlapped functional groups
+
+        functional_groups_exact : dict[str, int]
+            The frequency of each functional group exclusive of overlapped functional groups
+
+        skipped_template_count : int
+            The number of functional group templates skipped by the atom and bond composition screen
+
+        profile : dict | None
+            The stage profile of the molecule (see :py:meth:`profiling.StageProfile.asDict`), or None when it was not profiled
+
+        Returns
+        -------
+        MoleculeResult
+            The result record of the molecule
+    """
+
+    __slots__ = (
+        "name",
+        "aromatic_ring_count",
+        "non_aromatic_ring_count",
+        "amino_acid",
+        "functional_groups_all",
+        "functional_groups_exact",
+        "skipped_template_count",
+        "profile",
+    )
+
+    def __init__(self, 
+        name: str, 
+        aromatic_ring_count: int, 
+        non_aromatic_ring_count: int, 
+        amino_acid: bool, 
+        functional_groups_all: "dict[str, int]", 
+        functional_groups_exact: "dict[str, int]", 
+        skipped_template_count: int,
+        profile: "dict | None" = None,
+    ):
+        """Generates a result record of an organic molecule"""
+
+        self.name: str = name
+        """The name identifier of the molecule"""
+
+        self.aromatic_ring_count: int = aromatic_ring_count
+        """The number of aromatic rings in the molecule"""
+
+        self.non_aromatic_ring_count: int = non_aromatic_ring_count
+        """The number of non aromatic rings in the molecule"""
+
+        self.amino_acid: bool = amino_acid
+        """The assertion of a present amino acid in the molecule"""
+
+        self.functional_groups_all: dict[str, int] = functional_groups_all
+        """The frequency of each functional group inclusive of overlapped functional groups"""
+
+        self.functional_groups_exact: dict[str, int] = functional_groups_exact
+        """The frequency of each functional group exclusive of overlapped functional groups"""
+
+        self.skipped_template_count: int = skipped_template_count
+        """The number of functional group templates skipped by the atom and bond composition screen"""
+
+        self.profile: "dict | None" = profile
+        """The stage profile of the molecule, which is not part of the cacheable :py:meth:`asDict` record"""
+
+    @property
+    def total_ring_count(self) -> int:
+        """The total number of rings in the molecule"""
+        return self.aromatic_ring_count + self.non_aromatic_ring_count
+
+    def asDict(self) -> dict:
+        """Converts the record into a dictionary of its fields and total ring count, keeping the order of the functional group counts"""
+        return {
+            "aromatic_ring_count": self.aromatic_ring_count,
+            "non_aromatic_ring_count": self.non_aromatic_ring_count,
+            "total_ring_count": self.total_ring_count,
+            "amino_acid": self.amino_acid,
+            "functional_groups_all": self.functional_groups_all,
+            "functional_groups_exact": self.functional_groups_exact,
+            "skipped_template_count": self.skipped_template_count,
+        }
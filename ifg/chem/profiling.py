@@ -0,0 +1,242 @@
+"""Opt-in per-stage wall time and counter instrumentation of organic molecule identification"""
+
+import heapq
+import json
+import math
+from time import perf_counter
+from typing import Mapping
+
+##### Instrumented Stages #####
+STAGES: "tuple[str, ...]" = (
+    "tokenize",
+    "createVertices",
+    "createEdges",
+    "createRings",
+    "screen",
+    "startPairs",
+    "match",
+    "hierarchyFilter",
+    "overlapFilter",
+)
+"""The timed stages of building a molecule graph and identifying its rings and functional groups, in execution order"""
+
+##### Instrumented Counters #####
+COUNTERS: "tuple[str, ...]" = (
+    "dfs_calls",
+    "search_states",
+    "candidate_pairs",
+    "matches",
+    "hierarchy_filtered",
+    "overlap_filtered",
+)
+"""The counters of the functional group search of a molecule, see :py:class:`StageProfile`"""
+
+##### Summary Percentiles #####
+_PERCENTILES: "tuple[int, ...]" = (50, 90, 99)
+"""The percentiles of each stage and counter reported by :py:meth:`ProfileSummary.summary`"""
+
+
+##### Histogram Bucket Growth #####
+_BUCKET_BASE: float = 1.02
+"""The ratio of the upper to the lower bound of each :py:class:`LogHistogram` bucket, which bounds the relative percentile error to about 1%"""
+
+##### Histogram Bucket Range #####
+_BUCKET_RANGE: "tuple[int, int]" = (math.floor(math.log(1e-9, _BUCKET_BASE)), math.ceil(math.log(1e12, _BUCKET_BASE)))
+"""The smallest and largest :py:class:`LogHistogram` bucket, covering the values 1e-9 to 1e12 (values beyond are kept in the outermost buckets)"""
+
+
+class LogHistogram():
+    """A streaming histogram of non negative values in logarithmic buckets, whose memory does not grow with the number of values.
+
+        Each positive value is counted in the bucket ``floor(log(value, 1.02))``, so a percentile read back from the buckets is within
+        about 1% of the exact percentile, while the count, sum, minimum and maximum of the values are exact.
+
+        Returns
+        -------
+        LogHistogram
+            The empty histogram
+    """
+
+    __slots__ = ("count", "total", "minimum", "maximum", "zeros", "buckets")
+
+    def __init__(self):
+        """Generates an empty histogram"""
+
+        self.count: int = 0
+        """The number of values"""
+
+        self.total: float = 0.0
+        """The sum of the values"""
+
+        self.minimum: float = math.inf
+        """The smallest value"""
+
+        self.maximum: float = 0.0
+        """The largest value"""
+
+        self.zeros: int = 0
+        """The number of zero (or negative) values"""
+
+        self.buckets: "dict[int, int]" = {}
+        """The number of positive values in each logarithmic bucket"""
+
+    def add(self, value: float):
+        """Counts one value"""
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        if value <= 0:
+            self.zeros += 1
+        else:
+            bucket = min(max(math.floor(math.log(value, _BUCKET_BASE)), _BUCKET_RANGE[0]), _BUCKET_RANGE[1])
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def percentile(self, q: float) -> float:
+        """The ``q``-th percentile of the values, the geometric middle of the bucket holding the value of that rank (0 without values)"""
+        if not self.count:
+            return 0.0
+        rank = math.ceil((self.count - 1) * q / 100)
+        if rank < self.zeros:
+            return min(self.minimum, 0.0)
+        seen = self.zeros
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if rank < seen:
+                return min(max(_BUCKET_BASE**(bucket + 0.5), self.minimum), self.maximum)
+        return self.maximum
+
+
+class StageProfile():
+    """The per-stage wall time and search counters of one organic molecule.
+
+        Created by a :py:class:`molecule.Molecule` built with ``profile=True``, which laps the profile clock
+        at the end of each of the :py:data:`STAGES`. A molecule built without a profile skips every lap,
+        so the instrumentation costs nothing when it is disabled.
+
+        The counters are
+            | ``dfs_calls``           the sub-graph searches started from a :ref:`Like Vertex Pair <like-vertex-pair-ref>`
+            | ``search_states``       the search states created by the matching backend (recursive search calls of the dfs backend)
+            | ``candidate_pairs``     the (functional group edge, molecular edge) candidate pairs tested by the matching backend (vf2 backend only)
+            | ``matches``             the unique functional group matches before the accuracy filters
+            | ``hierarchy_filtered``  the matches removed by :py:meth:`molecule.Molecule.hierarchyFilter`
+            | ``overlap_filtered``    the matches removed from the exact matches by :py:meth:`molecule.Molecule.overlapFilter`
+
+        Returns
+        -------
+        StageProfile
+            The empty profile, whose clock starts now
+    """
+
+    __slots__ = ("seconds", "counters", "clock")
+
+    def __init__(self):
+        """Generates an empty stage profile and starts its clock"""
+
+        self.seconds: "dict[str, float]" = dict.fromkeys(STAGES, 0.0)
+        """The wall time in seconds of each stage"""
+
+        self.counters: "dict[str, int]" = dict.fromkeys(COUNTERS, 0)
+        """The value of each search counter"""
+
+        self.clock: float = perf_counter()
+        """The time of the last lap or start of the clock"""
+
+    def start(self):
+        """Restarts the clock at the beginning of a stage"""
+        self.clock = perf_counter()
+
+    def lap(self, stage: str):
+        """Adds the time since the last lap or start to a stage and restarts the clock"""
+        now = perf_counter()
+        self.seconds[stage] += now - self.clock
+        self.clock = now
+
+    def asDict(self) -> "dict[str, dict]":
+        """Converts the profile into a picklable and JSON serializable dictionary of its seconds and counters"""
+        return {"seconds": dict(self.seconds), "counters": dict(self.counters)}
+
+
+class ProfileSummary():
+    """A streaming aggregate of the stage profiles of many molecules.
+
+        Keeps a :py:class:`LogHistogram` per stage and counter, plus the ``top`` largest values of each with the name
+        of their molecule, so the memory of the summary stays fixed however many molecules are profiled. Molecules whose results
+        come from a result cache are not profiled, and are only counted with :py:meth:`addCached`.
+
+        Parameters
+        ----------
+        top : int
+            The number of slowest molecules (largest counter values) kept per stage (counter)
+
+        Returns
+        -------
+        ProfileSummary
+            The empty summary
+
+        Example
+        -------
+            >>> summary = ProfileSummary(top=10)
+            >>> summary.add(mol.name, mol.profile.asDict())
+            >>> summary.dump("profile.json")
+    """
+
+    def __init__(self, top: int = 10):
+        """Generates an empty profile summary"""
+
+        self.top: int = top
+        """The number of slowest molecules kept per stage and counter"""
+
+        self.count: int = 0
+        """The number of profiled molecules"""
+
+        self.cached: int = 0
+        """The number of molecules reused from a result cache without being identified (or profiled)"""
+
+        self.histograms: "dict[str, LogHistogram]" = {key: LogHistogram() for key in (*STAGES, *COUNTERS, "total")}
+        """The histogram of each stage, counter and total time over the profiled molecules"""
+
+        self.largest: "dict[str, list[tuple[float, int, str]]]" = {key: [] for key in self.histograms}
+        """The min-heap of the (value, molecule position, name) of the ``top`` largest values of each stage and counter"""
+
+    def add(self, name: str, profile: "Mapping[str, Mapping[str, float]]"):
+        """Adds the profile of one molecule, see :py:meth:`StageProfile.asDict`"""
+
+        values = {**profile["seconds"], **profile["counters"], "total": sum(profile["seconds"].values())}
+        for key, value in values.items():
+            self.histograms[key].add(value)
+            heap = self.largest[key]
+            if len(heap) < self.top:
+                heapq.heappush(heap, (value, self.count, name))
+            elif value > heap[0][0]:
+                heapq.heapreplace(heap, (value, self.count, name))
+        self.count += 1
+
+    def addCached(self, count: int):
+        """Counts molecules reused from a result cache, which have no profile"""
+        self.cached += count
+
+    def summary(self) -> "dict[str, object]":
+        """Aggregates the profiles into the profiled and cached molecule counts and the sum, mean, percentiles, maximum and largest molecules of each stage, counter and the total time"""
+
+        def aggregate(key: str) -> "dict[str, object]":
+            histogram = self.histograms[key]
+            return {
+                "sum": histogram.total,
+                "mean": histogram.total / max(histogram.count, 1),
+                **{f"p{q}": histogram.percentile(q) for q in _PERCENTILES},
+                "max": histogram.maximum,
+                "top": [{"name": name, "value": value} for value, _, name in sorted(self.largest[key], reverse=True)],
+            }
+
+        return {
+            "molecules": self.count,
+            "cached_molecules": self.cached,
+            "seconds": {stage: aggregate(stage) for stage in (*STAGES, "total")},
+            "counters": {counter: aggregate(counter) for counter in COUNTERS},
+        }
+
+    def dump(self, path: str):
+        """Writes the :py:meth:`summary` of the profiles to a JSON file"""
+        with open(path, "w", encoding="UTF-8") as file:
+            json.dump(self.summary(), file, indent=4)
@@ -0,0 +1,163 @@
+"""Incremental output sinks which write functional group data rows as they are identified"""
+
+import csv
+import json
+import tempfile
+from typing import IO, Sequence
+
+import xlsxwriter
+
+##### Structure Data Columns #####
+STRUCTURE_COLUMNS: "tuple[str, ...]" = ("Refcode", "SMILES", "Aromatic Rings", "Non Aromatic Rings", "Rings", "AminoAcid")
+"""The leading structure columns of every functional group data row, before the functional group columns"""
+
+##### Data Sheet Names #####
+SHEET_NAMES: "tuple[str, str]" = ("all_data", "exact_data")
+"""The names of the all and exact functional group format data sheets"""
+
+
+class Sink():
+    """An output sink which receives the all and exact functional group format data rows of each structure in input order.
+
+        Sinks are context managers, and the output is complete once the sink is closed.
+    """
+
+    def write(self, all_row: dict, exact_row: dict):
+        """Writes the all and exact functional group format data rows of one structure"""
+        raise NotImplementedError
+
+    def close(self):
+        """Finishes the output of the sink"""
+
+    def __enter__(self) -> "Sink":
+        """Uses the sink as a context manager"""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Closes the sink when leaving the context"""
+        self.close()
+
+
+class ExcelSink(Sink):
+    """An excel output sink with the ``all_data`` and ``exact_data`` sheet layout of a pandas export.
+
+        The rows are spooled to temporary files as they arrive while the first-seen order of the functional group columns is tracked,
+        then streamed into the excel file in constant memory when the sink is closed, with missing functional group counts written as 0.
+        Memory stays flat in the number of structures, while excel itself limits a sheet to 1,048,575 structures.
+
+        Parameters
+        ----------
+        path : str
+            The excel (xlsx) file to create
+
+        Returns
+        -------
+        ExcelSink
+            The open excel sink
+    """
+
+    def __init__(self, path: str):
+        """Opens the row spool files of an excel sink"""
+
+        self.path: str = path
+        """The excel file created by the sink"""
+
+        self.spools: "tuple[IO[str], IO[str]]" = (
+            tempfile.TemporaryFile(mode="w+", encoding="UTF-8"),
+            tempfile.TemporaryFile(mode="w+", encoding="UTF-8"),
+        )
+        """The temporary JSON lines files of the all and exact data rows"""
+
+        self.columns: "tuple[dict[str, None], dict[str, None]]" = ({}, {})
+        """The first-seen ordered columns of the all and exact data rows"""
+
+    def write(self, all_row: dict, exact_row: dict):
+        """Spools the all and exact functional group format data rows of one structure"""
+        for spool, columns, row in zip(self.spools, self.columns, (all_row, exact_row)):
+            columns.update(dict.fromkeys(row))
+            spool.write(json.dumps(row) + "\n")
+
+    def close(self):
+        """Streams the spooled rows into the sheets of the excel file"""
+
+        workbook = xlsxwriter.Workbook(self.path, {"constant_memory": True})
+        header_format = workbook.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+
+        ##### Data Sheets Loop #####
+        for sheet_name, spool, columns in zip(SHEET_NAMES, self.spools, self.columns):
+            sheet = workbook.add_worksheet(sheet_name)
+            sheet.freeze_panes(1, 1)
+
+            ##### Column Widths #####
+            sheet.set_column(0, 0, 13)      # Refcode column width
+            sheet.set_column(1, 1, 125)     # SMILES column width
+            for i, col in enumerate(list(columns)[2:]):
+                sheet.set_column(i+2, i+2, len(col)+7)
+
+            ##### Header Row #####
+            for j, col in enumerate(columns):
+                sheet.write_string(0, j, col, header_format)
+
+            ##### Spooled Rows Stream #####
+            spool.seek(0)
+            for i, line in enumerate(spool, start=1):
+                row = json.loads(line)
+                sheet.write_string(i, 0, row["Refcode"], header_format)
+                for j, col in enumerate(columns):
+                    if j:
+                        sheet.write(i, j, row.get(col, 0))
+            spool.close()
+
+        ##### Excel File Save #####
+        workbook.close()
+
+
+class CsvSink(Sink):
+    """A csv output sink which appends each data row to an all and an exact csv file as soon as it arrives.
+
+        The columns are fixed before the first row, so the files can be written incrementally
+        without any limit on the number of structures.
+
+        Parameters
+        ----------
+        all_path : str
+            The csv file of the all functional group format data
+
+        exact_path : str
+            The csv file of the exact functional group format data
+
+        fg_columns : Sequence[str]
+            The fixed functional group columns, see :py:attr:`templates.FunctionalGroupLibrary.columns`
+
+        Returns
+        -------
+        CsvSink
+            The open csv sink
+    """
+
+    def __init__(self, all_path: str, exact_path: str, fg_columns: "Sequence[str]"):
+        """Opens the csv files of a csv sink and writes their header rows"""
+
+        self.files: "tuple[IO[str], IO[str]]" = (
+            open(all_path, "w", newline="", encoding="UTF-8"),
+            open(exact_path, "w", newline="", encoding="UTF-8"),
+        )
+        """The open all and exact csv files"""
+
+        self.writers: "tuple[csv.DictWriter, csv.DictWriter]" = tuple(
+            csv.DictWriter(file, fieldnames=[*STRUCTURE_COLUMNS, *fg_columns], restval=0) for file in self.files
+        )
+        """The csv row writers of the all and exact csv files"""
+
+        for writer in self.writers:
+            writer.writeheader()
+
+    def write(self, all_row: dict, exact_row: dict):
+        """Appends the all and exact functional group format data rows of one structure"""
+        self.writers[0].writerow(all_row)
+        self.writers[1].writerow(exact_row)
+
+    def close(self):
+        """Closes the csv files"""
+        for file in self.files:
+            file.close()
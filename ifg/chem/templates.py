@@ -0,0 +1,250 @@
+"""A compiled library of the functional group templates searched for in organic molecules"""
+
+from collections import Counter
+import csv
+import os
+from typing import TYPE_CHECKING, Iterable, NamedTuple
+
+from .constants import FUNCTIONAL_GROUP_SMILES_CODES_PATH
+from .matching import DiscriminationTree
+
+if TYPE_CHECKING:
+    from .molecule import Molecule
+
+
+class FunctionalGroupTemplate(NamedTuple):
+    """A functional group template compiled from its hydrogen-suppressed SMILES code.
+
+        Parameters
+        ----------
+        smiles : str
+            The hydrogen-suppressed SMILES code of the functional group
+
+        name : str
+            The name of the functional group
+
+        graph : Molecule
+            The software molecule graph of the functional group, shared by every molecule searched for it and never modified
+
+        core_atoms : Counter[str]
+            The number of *core* vertices of each atom symbol, which an organic molecule must have to match the template
+
+        core_bonds : Counter[str]
+            The number of edges between *core* vertices of each bond type, which an organic molecule must have to match the template
+
+        core_vertices : Counter[tuple[str, int]]
+            The number of *core* vertices of each (atom symbol, total degree), which are those of the molecular vertices of any match
+
+        core_edges : frozenset[tuple[str, str, str]]
+            The structural (bond type, atom symbol, atom symbol) *core* edges, shared by every match of the template
+    """
+
+    smiles: str
+    name: str
+    graph: "Molecule"
+    core_atoms: "Counter[str]"
+    core_bonds: "Counter[str]"
+    core_vertices: "Counter[tuple[str, int]]"
+    core_edges: "frozenset[tuple[str, str, str]]"
+
+    def screen(self, atom_freq: "dict[str, int]", bond_freq: "dict[str, int]") -> bool:
+        """Checks whether an organic molecule has enough atoms and bonds of each type to contain the functional group.
+
+            A molecule which fails the screen can never match the template, so its graph search is skipped.
+
+            Parameters
+            ----------
+            atom_freq : dict[str, int]
+                The frequency of each atom symbol in the organic molecule, see :py:attr:`molecule.Molecule.atom_freq`
+
+            bond_freq : dict[str, int]
+                The frequency of each bond type in the organic molecule, see :py:attr:`molecule.Molecule.bond_freq`
+
+            Returns
+            -------
+            bool
+                False when the organic molecule cannot contain the functional group
+        """
+        return (
+            all(atom_freq.get(symbol, 0) >= count for symbol, count in self.core_atoms.items())
+            and all(bond_freq.get(bond_type, 0) >= count for bond_type, count in self.core_bonds.items())
+        )
+
+
+def createTemplate(fg_smiles: str, fg_name: str) -> FunctionalGroupTemplate:
+    """Compiles a functional group SMILES code into a template with its graph and required atom and bond counts.
+
+        Parameters
+        ----------
+        fg_smiles : str
+            The hydrogen-suppressed SMILES code of the functional group
+
+        fg_name : str
+            The name of the functional group
+
+        Returns
+        -------
+        FunctionalGroupTemplate
+            The compiled functional group template
+    """
+    from .molecule import Molecule
+    fg = Molecule(fg_smiles, fg_name, "fg")
+    return FunctionalGroupTemplate(
+        fg_smiles,
+        fg_name,
+        fg,
+        Counter(vertex.symbol for vertex in fg.vertices if vertex.symbol != 'R'),
+        Counter(edge.bond_type for edge in fg.edges if 'R' not in edge.symbols),
+        Counter((vertex.symbol, vertex.total_degree) for vertex in fg.vertices if vertex.symbol != 'R'),
+        frozenset((edge.bond_type, *edge.symbols) for edge in fg.edges if 'R' not in edge.symbols),
+    )
+
+
+class FunctionalGroupLibrary():
+    """An immutable library of compiled functional group templates.
+
+        The library is loaded and compiled by :py:func:`loadFunctionalGroupLibrary`, which
+        shares a single library between every molecule of a process.
+
+        Parameters
+        ----------
+        path : str
+            The functional group SMILES codes csv file the library was compiled from
+
+        templates : tuple[FunctionalGroupTemplate, ...]
+            The compiled functional group templates in the order of the csv file
+
+        The start vertices of the templates are merged into one shared :py:class:`matching.DiscriminationTree`.
+
+        Returns
+        -------
+        FunctionalGroupLibrary
+            The library of functional group templates
+    """
+
+    __slots__ = ("path", "templates", "start_tree", "columns", "closures")
+
+    def __init__(self, path: str, templates: "tuple[FunctionalGroupTemplate, ...]"):
+        """Generates a new library of compiled functional group templates"""
+
+        self.path: str = path
+        """The functional group SMILES codes csv file the library was compiled from"""
+
+        self.templates: "tuple[FunctionalGroupTemplate, ...]" = templates
+        """The compiled functional group templates in the order of the csv file"""
+
+        self.start_tree: DiscriminationTree = DiscriminationTree(templates)
+        """The discrimination tree shared by the start vertices of every template"""
+
+        self.columns: "tuple[str, ...]" = tuple(
+            prefix + template.name for template in templates for prefix in ("", "Aromatic ", "Non Aromatic ")
+        )
+        """The fixed functional group column vocabulary of the library, each template name followed by its ring classified names"""
+
+        self.closures: "dict[frozenset[str], tuple[list[bool], DiscriminationTree]]" = {}
+        """Dictionary of requested template names to their computed :py:meth:`closure` and its start vertex tree"""
+
+    def __len__(self) -> int:
+        """Number of functional group templates in the library"""
+        return len(self.templates)
+
+    def __iter__(self):
+        """Iterates over the functional group templates in the order of the csv file"""
+        return iter(self.templates)
+
+    def groupColumns(self, names: "Iterable[str] | None" = None) -> "tuple[str, ...]":
+        """The functional group columns of a subset of template names in library order (every column when None)"""
+        if names is None:
+            return self.columns
+        names = set(names)
+        return tuple(col for template in self.templates if template.name in names for col in (template.name, "Aromatic " + template.name, "Non Aromatic " + template.name))
+
+    def closure(self, names: "Iterable[str]") -> "list[bool]":
+        """Finds the templates which must be searched to identify a subset of functional groups with the same counts as a full search.
+
+            Every *core* vertex of a match is paired with a molecular vertex of the same atom symbol and total degree.
+            A requested group ``R`` is only removed from the *all* counts by the hierarchy filter when a match of another
+            template covers the same *core* atoms and bonds, so the templates with the same *core* (symbol, total degree) counts ``H(R)``
+            must be searched too. It is only removed from the *exact* counts by the overlap filter when a larger match covers its *core* atoms,
+            so the templates with more *core* atoms whose *core* (symbol, total degree) counts contain those of ``R`` (``O(R)``) and their own
+            hierarchical templates ``H(O(R))`` must be searched too. Templates outside ``R ∪ H(R) ∪ O(R) ∪ H(O(R))`` can never change
+            the counts of a requested group.
+
+            Parameters
+            ----------
+            names : Iterable[str]
+                The requested functional group template names
+
+            Returns
+            -------
+            list[bool]
+                Whether each template by template position must be searched
+        """
+
+        requested = frozenset(names)
+        if requested in self.closures:
+            return self.closures[requested][0]
+        assert requested <= {template.name for template in self.templates}, f"Unknown functional groups {sorted(requested - {template.name for template in self.templates})}"
+
+        ##### Requested & Overlapping Templates (R ∪ O(R)) #####
+        related: "list[Counter[tuple[str, int]]]" = []
+        for template in self.templates:
+            if template.name in requested:
+                related.append(template.core_vertices)
+                related.extend(
+                    other.core_vertices for other in self.templates
+                    if other.core_vertices.total() > template.core_vertices.total() and all(other.core_vertices[vertex] >= count for vertex, count in template.core_vertices.items())
+                )
+
+        ##### Hierarchical Templates (H(R ∪ O(R))) #####
+        needed = [template.core_vertices in related for template in self.templates]
+        self.closures[requested] = (needed, DiscriminationTree(self.templates, needed))
+        return needed
+
+    def startTree(self, names: "Iterable[str] | None" = None) -> DiscriminationTree:
+        """The discrimination tree of the start vertices of the :py:meth:`closure` templates of a subset of template names (every template when None)"""
+        if names is None:
+            return self.start_tree
+        self.closure(names)
+        return self.closures[frozenset(names)][1]
+
+
+##### Compiled Libraries Cache #####
+_compiled_libraries: "dict[str, tuple[tuple[int, int], FunctionalGroupLibrary]]" = {}
+"""Dictionary of csv file path to the (modification time, file size) stamp and library it was compiled into"""
+
+
+def loadFunctionalGroupLibrary(path: str = FUNCTIONAL_GROUP_SMILES_CODES_PATH) -> FunctionalGroupLibrary:
+    """Loads and compiles the functional group templates of a functional group SMILES codes csv file.
+
+        The csv file is read and each template SMILES code is parsed into a software molecule graph
+        only once per process. Later calls return the same library until the modification time
+        or size of the csv file changes, which compiles the library again.
+
+        Parameters
+        ----------
+        path : str
+            The functional group SMILES codes csv file to load, in the ``smiles, name`` row format
+
+        Returns
+        -------
+        FunctionalGroupLibrary
+            The compiled functional group templates of the csv file
+    """
+
+    ##### Cached Library Validation #####
+    stat = os.stat(path)
+    stamp: tuple[int, int] = (stat.st_mtime_ns, stat.st_size)
+    if path in _compiled_libraries and _compiled_libraries[path][0] == stamp:
+        return _compiled_libraries[path][1]
+
+    ##### Template Compilation #####
+    with open(path, encoding="UTF-8") as functional_group_smiles_codes_csv_file:
+        library = FunctionalGroupLibrary(path, tuple(
+            createTemplate(fg_smiles, fg_name)
+            for (fg_smiles, fg_name) in csv.reader(functional_group_smiles_codes_csv_file, delimiter=",", skipinitialspace=True)
+        ))
+
+    ##### Library Cache #####
+    _compiled_libraries[path] = (stamp, library)
+    return library
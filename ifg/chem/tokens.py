@@ -0,0 +1,70 @@
+"""A single-pass tokenizer for the symbols of a hydrogen-suppressed SMILES code"""
+
+from typing import Literal, NamedTuple
+
+from .constants import TOKEN_REGEX
+
+
+class Token(NamedTuple):
+    """A classified symbol of a hydrogen-suppressed SMILES code.
+
+        Parameters
+        ----------
+        kind : Literal["atom", "bond", "digit", "parenth"]
+            The kind of SMILES symbol, according to the TOKEN_REGEX capture group it matched
+
+        symbol : str
+            The SMILES symbol, with charges attached to atoms as needed
+
+        atom_index : int
+            The vertex index of an atom symbol, or the vertex index of the most recent atom symbol for any other symbol
+    """
+
+    kind: Literal["atom", "bond", "digit", "parenth"]
+    symbol: str
+    atom_index: int
+
+
+##### Raw Tuple Constructor #####
+_new_tuple = tuple.__new__
+
+
+def tokenize(smiles: str) -> "list[Token]":
+    """Tokenizes a hydrogen-suppressed SMILES code into its classified symbols in a single pass.
+
+        Parameters
+        ----------
+        smiles : str
+            A hydrogen-suppressed SMILES code
+
+        Returns
+        -------
+        list[Token]
+            The classified symbols of the SMILES code, left to right
+
+        Example
+        -------
+            >>> tokenize("CC(=O)O")[:4]
+            [Token(kind='atom', symbol='C', atom_index=0), Token(kind='atom', symbol='C', atom_index=1), Token(kind='parenth', symbol='(', atom_index=1), Token(kind='bond', symbol='=', atom_index=1)]
+    """
+
+    ##### Token Stream #####
+    tokens: list[Token] = []
+    atom_index: int = 0
+    first_atom: bool = True
+
+    ##### Symbols Loop #####
+    for match in TOKEN_REGEX.finditer(smiles):
+        kind = match.lastgroup
+
+        ##### Atom Index Counter #####
+        if kind == "atom":
+            if first_atom:
+                first_atom = False
+            else:
+                atom_index+=1
+
+        ##### Token Construction (tuple.__new__ skips the slower NamedTuple constructor call) #####
+        tokens.append(_new_tuple(Token, (kind, match.group(), atom_index)))
+
+    return tokens
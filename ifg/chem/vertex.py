@@ -30,6 +30,17 @@ class Vertex():
     
     """
 
+    __slots__ = (
+        "index",
+        "symbol",
+        "ring_type",
+        "implicit_degree",
+        "explicit_degree",
+        "total_degree",
+        "valence_electrons_required",
+        "charge",
+    )
+
     def __init__(self, 
         index: int = 0, 
         symbol: str = 'C', 
@@ -0,0 +1,73 @@
+"""Synthetic organic molecule SMILES code series of growing size for benchmarks and scaling tests"""
+
+from typing import Callable
+
+
+def alkaneSmiles(length: int) -> str:
+    """The hydrogen-suppressed SMILES code of the n-alkane chain with ``length`` carbon atoms"""
+    assert length >= 1
+    return "C"*length
+
+
+def aceneSmiles(length: int) -> str:
+    """The hydrogen-suppressed SMILES code of the linear acene with ``length`` fused benzene rings.
+
+        The rings are written one after another, each closing its shared edge with the previous ring through a branch,
+        so only the ring identifiers 1 and 2 are ever open and any number of rings can be written with single digit ring identifiers.
+        For example the acene of 3 rings (anthracene) is ``c1cc2c(cc1)cc1c(c2)cccc1``.
+    """
+    assert length >= 1
+    if length == 1:
+        return "c1ccccc1"
+
+    ##### First Ring (Opens Its Shared Edge Identifier) #####
+    smiles: list[str] = ["c1cc2c(cc1)"]
+
+    ##### Fused Ring Loop #####
+    for ring in range(1, length):
+        closing = "2" if ring % 2 else "1"
+        if ring == length-1:
+            smiles.append("ccc" + "c" + closing)
+        else:
+            opening = "1" if ring % 2 else "2"
+            smiles.append("cc" + opening + "c(c" + closing + ")")
+    return "".join(smiles)
+
+
+def polyesterSmiles(length: int) -> str:
+    """The hydrogen-suppressed SMILES code of the polyester oligomer with ``length`` ester repeat units, ``C(C(=O)OC)n``"""
+    assert length >= 1
+    return "C" + "C(=O)OC"*length
+
+
+def peptideSmiles(length: int) -> str:
+    """The hydrogen-suppressed SMILES code of the peptide-like (polyglycine) chain with ``length`` residues, ``(NCC(=O))nO``"""
+    assert length >= 1
+    return "NCC(=O)"*length + "O"
+
+
+##### Stress Molecule Repeat Unit #####
+STRESS_UNIT: str = "c1ccc(cc1)C(=O)NC(CO)C(=O)OCC=CC(Cl)"
+"""The 20 heavy atom repeat unit of :py:func:`stressSmiles`, an aromatic ring, amide, alcohol, ester, alkene and halide chained one after another"""
+
+
+def stressSmiles(heavy_atoms: int) -> str:
+    """The hydrogen-suppressed SMILES code of a chain of :py:data:`STRESS_UNIT` repeat units with exactly ``heavy_atoms`` heavy atoms.
+
+        The repeat units reuse the ring identifier 1, and the chain is padded with carbon atoms to the requested size,
+        so molecules of any size (such as the 10,000 heavy atoms supported by :py:class:`molecule.Molecule`) mix rings,
+        branches and functional groups in a fixed proportion.
+    """
+    assert heavy_atoms >= 1
+    units, padding = divmod(heavy_atoms, 20)
+    return STRESS_UNIT*units + "C"*padding
+
+
+##### Scaling Series #####
+SERIES: "dict[str, Callable[[int], str]]" = {
+    "n-alkane": alkaneSmiles,
+    "acene": aceneSmiles,
+    "polyester": polyesterSmiles,
+    "peptide": peptideSmiles,
+}
+"""Dictionary of scaling series name to the SMILES code generator of its molecule of a given length"""
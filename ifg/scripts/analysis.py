@@ -9,6 +9,9 @@ import numpy
 import pandas
 from progress.spinner import PieSpinner
 
+from chem.bandgaps import bandgapBinCounts, bandgapBins
+from chem.columnar import readColumnar
+
 ##### Spinner Progress #####
 spinner = PieSpinner("Processing ")
 spinner.next()
@@ -17,6 +20,10 @@ spinner.next()
 MAIN_OUTPUT_PATH = os.path.dirname(__file__) + '/output/functional_groups.xlsx'
 """Excel file generated by the main.py script"""
 
+##### Target Main Output Columnar File #####
+MAIN_COLUMNAR_PATH = None
+"""Columnar binary file generated by the main.py script, read instead of the excel file when set (see COLUMNAR_OUTPUT_PATH in main.py)"""
+
 ##### Target Analysis Output Excel Sheet #####
 ANALYSIS_OUTPUT_PATH = os.path.dirname(__file__) + '/output/stats.xlsx'
 """Excel file generated by this script"""
@@ -25,6 +32,10 @@ ANALYSIS_OUTPUT_PATH = os.path.dirname(__file__) + '/output/stats.xlsx'
 BANDGAPS_PATH = os.path.dirname(__file__) + '/output/CrystalData.xlsx'
 """Excel file with the bandgaps used by this script"""
 
+##### Bandgap Bin Width #####
+BANDGAP_BIN_WIDTH = 0.5
+"""Width in eV of each bandgap bin, where the bins start at 0 eV and span up to the next whole eV above the largest bandgap (see chem.bandgaps.bandgapBins)"""
+
 ##### User Defined combinational Functional Group Sets #####
 SETS = [
     ["PrimaryAmine", "SecondaryAmine", "TertiaryAmine"],
@@ -98,37 +109,29 @@ spinner.next()
 
 ##### Data Load #####
 bandgap_data: pandas.Series = pandas.read_excel(BANDGAPS_PATH, sheet_name="All")["bandgap"]
-fg_data: pandas.DataFrame = pandas.read_excel(MAIN_OUTPUT_PATH, sheet_name="exact_data").drop("AminoAcid", axis=1)
+fg_data: pandas.DataFrame = (
+    readColumnar(MAIN_COLUMNAR_PATH, sheet_name="exact_data") if MAIN_COLUMNAR_PATH
+    else pandas.read_excel(MAIN_OUTPUT_PATH, sheet_name="exact_data")
+).drop("AminoAcid", axis=1)
 bandgap_fg_data: pandas.DataFrame = pandas.concat([fg_data, bandgap_data], axis=1).set_index("Refcode").drop("SMILES", axis=1)
 
 ##### Bandgap Bins #####
 max_bandgap: int = max(bandgap_fg_data["bandgap"])
-bandgap_bins: "list[float]" = [x*0.5 for x in range(0, 2*math.ceil(max_bandgap))]
-
-##### Bandgap Bin Sorted Molecular Structures #####
-bandgap_range_sorted_molecule_dataframes: list[pandas.DataFrame] = [
-    bandgap_fg_data.loc[
-        (bandgap_fg_data['bandgap'] >= bandgap) & 
-        (bandgap_fg_data['bandgap'] < bandgap+0.5)
-    ]
-    for bandgap in bandgap_bins
-]
+bandgap_bins: "list[float]" = bandgapBins(max_bandgap, BANDGAP_BIN_WIDTH)
 spinner.next()
 
 ##### Structure Count Validity Check #####
-molecule_set_sizes: list[int] = [len(molecules) for molecules in bandgap_range_sorted_molecule_dataframes]
-assert sum(molecule_set_sizes) == len(bandgap_fg_data)
+molecule_set_sizes: pandas.DataFrame = bandgapBinCounts(
+    bandgap_fg_data["bandgap"], pandas.DataFrame({"structures": True}, index=bandgap_fg_data.index), bandgap_bins, BANDGAP_BIN_WIDTH
+)
+assert sum(molecule_set_sizes["structures"]) == len(bandgap_fg_data)
 
 ##### Bandgap Row Organization Lookup #####
 bandgap_row_lookup: dict[float, int] = {bg_value: 1+row for row, bg_value in enumerate(bandgap_bins)}
 
 ########## Functional Group Independent Counting In Bin Sorted Structure Sets ##########
-##### Functional Group Independent Counts Data & Matrix #####
-independent_data: list[list[int]] = [
-    [len(bandgap_molecules_subtable.loc[bandgap_molecules_subtable[f] > 0]) for f in bandgap_fg_data.columns]
-    for bandgap_molecules_subtable in bandgap_range_sorted_molecule_dataframes
-]
-independent_matrix: pandas.DataFrame = pandas.DataFrame(data=independent_data, columns=bandgap_fg_data.columns, index=bandgap_bins)
+##### Functional Group Independent Counts Matrix (structures with each column present, grouped by bandgap bin) #####
+independent_matrix: pandas.DataFrame = bandgapBinCounts(bandgap_fg_data["bandgap"], bandgap_fg_data > 0, bandgap_bins, BANDGAP_BIN_WIDTH)
 
 ##### Independent Matrix Bandgap Means and Standard Deviations Calculations Per Functional Group Column #####
 independent_means: list[float]
@@ -158,13 +161,10 @@ for i, fg_set in enumerate(SETS):
     ##### Combinational Category Names #####
     combinational_category_names: list[str] = [' '.join(fgs) if len(fgs) > 1 else fgs[0] for fgs in powerset(fg_set) if fgs]
 
-    ##### Combinational Group Counts Data & Matrix #####
-    combinational_data: list[list[int]] = [
-        [len(bandgap_molecules_subtable.query(q)) for q in combinational_queries]
-        for bandgap_molecules_subtable in bandgap_range_sorted_molecule_dataframes
-    ]
-    combinational_matrix: pandas.DataFrame = pandas.DataFrame(data=combinational_data, columns=combinational_category_names, index=bandgap_bins)
-    combinational_matrix["total"] = [sum(d) for d in combinational_data]
+    ##### Combinational Group Counts Matrix (each query evaluated once, then counted per bandgap bin) #####
+    combinational_present: pandas.DataFrame = pandas.DataFrame({name: bandgap_fg_data.eval(q) for name, q in zip(combinational_category_names, combinational_queries)})
+    combinational_matrix: pandas.DataFrame = bandgapBinCounts(bandgap_fg_data["bandgap"], combinational_present, bandgap_bins, BANDGAP_BIN_WIDTH)
+    combinational_matrix["total"] = combinational_matrix.sum(axis=1)
     combinational_matrix = combinational_matrix.loc[:, (combinational_matrix != 0).any(axis=0)]
     spinner.next()
 
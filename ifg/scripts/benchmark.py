@@ -0,0 +1,190 @@
+"""Benchmarks the identification stages over the SMILES code datasets and synthetic scaling series, and stores the timings as JSON"""
+
+import csv
+import glob
+import json
+import math
+import os
+import platform
+import subprocess
+from time import perf_counter
+from typing import Callable, Sequence
+
+from chem.molecule import Molecule
+from chem.templates import loadFunctionalGroupLibrary
+from chem.workloads import SERIES, stressSmiles
+
+##### Benchmarked SMILES Datasets #####
+DATASETS_PATH = os.path.dirname(__file__) + "/smiles"
+"""Directory of the SMILES code csv files which are each benchmarked as one dataset"""
+
+##### Benchmark Output JSON File #####
+BENCHMARK_OUTPUT_PATH = os.path.dirname(__file__) + "/output/benchmark.json"
+"""JSON file of the benchmark timings generated by this script"""
+
+##### Baseline Benchmark JSON File #####
+BASELINE_PATH = None
+"""JSON file of an earlier benchmark run (such as one generated at another commit) to compare the timings with (None skips the comparison)"""
+
+##### Scaling Series Lengths #####
+SERIES_LENGTHS = (8, 16, 32, 64, 128)
+"""Lengths (carbon atoms, rings, repeat units or residues) of the generated molecules of each scaling series, see :py:data:`workloads.SERIES`"""
+
+##### Stress Molecule Sizes #####
+STRESS_HEAVY_ATOMS = (1250, 2500, 5000, 10000)
+"""Heavy atom counts of the generated large molecules of the stress series, see :py:func:`workloads.stressSmiles` (None skips the stress series)"""
+
+##### Timing Repeats #####
+REPEATS = 3
+"""Number of times each dataset and series molecule is timed, of which the fastest time is kept"""
+
+##### Benchmarked Stages #####
+STAGES = ("parse", "rings", "functional_groups")
+"""The timed stages, building the molecule graph (parse), perceiving its rings (rings) and identifying its functional groups (functional_groups)"""
+
+
+##### Molecule Stage Timing Function #####
+def timeMolecule(smiles: str) -> "tuple[float, float, float]":
+    """Times the parse, ring and functional group stages of one organic molecule in seconds"""
+
+    start = perf_counter()
+    mol = Molecule(smiles, type="mol")
+    parsed = perf_counter()
+    mol.ring_data
+    rings = perf_counter()
+    mol.functional_groups
+    end = perf_counter()
+    return (parsed - start, rings - parsed, end - rings)
+
+
+##### Dataset Benchmark Function #####
+def benchmarkDataset(path: str) -> dict:
+    """Times every structure of a SMILES code csv file, keeping the fastest of ``REPEATS`` passes over the whole file"""
+
+    with open(path, encoding="UTF-8") as structures_file:
+        rows = csv.reader(structures_file)
+        next(rows, None)
+        structures = [row[0] for row in rows if row]
+
+    ##### Repeated Passes #####
+    best: "dict[str, float] | None" = None
+    failed: int = 0
+    for _ in range(REPEATS):
+        seconds = dict.fromkeys(STAGES, 0.0)
+        failed = 0
+        for smiles in structures:
+            try:
+                for stage, stage_seconds in zip(STAGES, timeMolecule(smiles)):
+                    seconds[stage] += stage_seconds
+            except Exception:
+                failed += 1
+        if best is None or sum(seconds.values()) < sum(best.values()):
+            best = seconds
+
+    total = sum(best.values())
+    return {
+        "molecules": len(structures),
+        "failed": failed,
+        "seconds": {**best, "total": total},
+        "molecules_per_second": len(structures) / total if total else 0.0,
+    }
+
+
+##### Scaling Series Benchmark Function #####
+def benchmarkSeries(generator: "Callable[[int], str]", lengths: "Sequence[int]") -> dict:
+    """Times the molecules of a scaling series generated at each length and fits the exponent ``k`` of ``seconds ~ atoms**k``"""
+
+    points: list[dict] = []
+    for length in lengths:
+        smiles = generator(length)
+        timings = [timeMolecule(smiles) for _ in range(REPEATS)]
+        fastest = min(timings, key=sum)
+        points.append({
+            "length": length,
+            "atoms": Molecule(smiles).order,
+            "seconds": {**dict(zip(STAGES, fastest)), "total": sum(fastest)},
+            "molecules_per_second": 1 / sum(fastest),
+        })
+
+    return {
+        "points": points,
+        "exponent": {
+            stage: scalingExponent([point["atoms"] for point in points], [point["seconds"][stage] for point in points])
+            for stage in (*STAGES, "total")
+        },
+    }
+
+
+##### Scaling Exponent Function #####
+def scalingExponent(sizes: "list[float]", seconds: "list[float]") -> float:
+    """The least squares slope of log(seconds) against log(size), the empirical exponent ``k`` of ``seconds ~ size**k``"""
+
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(value, 1e-9)) for value in seconds]
+    x_mean, y_mean = sum(xs) / len(xs), sum(ys) / len(ys)
+    return sum((x - x_mean)*(y - y_mean) for x, y in zip(xs, ys)) / sum((x - x_mean)**2 for x in xs)
+
+
+##### Benchmark Comparison Function #####
+def compareBenchmarks(baseline: dict, current: dict) -> "list[str]":
+    """Lists the total time of each dataset and series molecule of two benchmark runs and the speedup of the current run"""
+
+    lines: list[str] = [f"{'benchmark':<48}{'baseline s':>12}{'current s':>12}{'speedup':>10}"]
+    for name, result in current["datasets"].items():
+        if name in baseline["datasets"]:
+            before, after = baseline["datasets"][name]["seconds"]["total"], result["seconds"]["total"]
+            lines.append(f"{name:<48}{before:>12.4f}{after:>12.4f}{before/after:>9.2f}x")
+    for name, result in current["series"].items():
+        baseline_points = {point["length"]: point for point in baseline["series"].get(name, {}).get("points", [])}
+        for point in result["points"]:
+            if point["length"] in baseline_points:
+                before, after = baseline_points[point["length"]]["seconds"]["total"], point["seconds"]["total"]
+                lines.append(f"{name + ' ' + str(point['length']):<48}{before:>12.4f}{after:>12.4f}{before/after:>9.2f}x")
+    return lines
+
+
+if __name__ == "__main__":
+
+    ##### Template Library Warm Up (not timed) #####
+    loadFunctionalGroupLibrary()
+    Molecule("CC(=O)OC").functional_groups
+
+    ##### Run Metadata #####
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except OSError:
+        commit = ""
+    benchmark: dict = {
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeats": REPEATS,
+        "datasets": {},
+        "series": {},
+    }
+
+    ##### SMILES Datasets #####
+    for path in sorted(glob.glob(os.path.join(DATASETS_PATH, "*.csv"))):
+        name = os.path.basename(path)
+        benchmark["datasets"][name] = benchmarkDataset(path)
+        result = benchmark["datasets"][name]
+        print(f"{name:<32}{result['molecules']:>6} molecules {result['molecules_per_second']:>10.1f} molecules/s")
+
+    ##### Scaling Series #####
+    for name in SERIES:
+        benchmark["series"][name] = benchmarkSeries(SERIES[name], SERIES_LENGTHS)
+        print(f"{name:<32}scaling exponent {benchmark['series'][name]['exponent']['total']:.2f}")
+
+    ##### Stress Series #####
+    if STRESS_HEAVY_ATOMS:
+        benchmark["series"]["stress"] = benchmarkSeries(stressSmiles, STRESS_HEAVY_ATOMS)
+        print(f"{'stress':<32}scaling exponent {benchmark['series']['stress']['exponent']['total']:.2f}")
+
+    ##### Benchmark Output #####
+    with open(BENCHMARK_OUTPUT_PATH, "w", encoding="UTF-8") as file:
+        json.dump(benchmark, file, indent=4)
+
+    ##### Baseline Comparison #####
+    if BASELINE_PATH:
+        with open(BASELINE_PATH, encoding="UTF-8") as file:
+            print("\n".join(compareBenchmarks(json.load(file), benchmark)))
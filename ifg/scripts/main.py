@@ -1,14 +1,20 @@
 """Creates functional group excel data sheet given a target smiles code set from a text file"""
 
+import contextlib
 import csv
+import itertools
 import logging
 import os
-import traceback
+from typing import Iterator
 
-import pandas
 from tqdm import tqdm
 
-from chem.molecule import Molecule
+from chem.batch import BatchPool, batchPool, identifyMolecules
+from chem.cache import ResultCache
+from chem.columnar import ColumnarSink
+from chem.profiling import ProfileSummary
+from chem.sinks import CsvSink, ExcelSink, Sink
+from chem.templates import loadFunctionalGroupLibrary
 
 ##### Target Molecular SMILES Codes #####
 STRUCTURES_PATH = os.path.dirname(__file__) + "/smiles/smiles.csv"
@@ -16,95 +22,212 @@ STRUCTURES_PATH = os.path.dirname(__file__) + "/smiles/smiles.csv"
 
 ##### Target Main Output Excel Sheet #####
 MAIN_OUTPUT_PATH = os.path.dirname(__file__) + '/output/functional_groups.xlsx'
-"""Excel file generated by this script"""
-
-##### Failed Structure Logging Setup #####
-with open("main.log", mode="w", encoding="UTF-8") as file:
-    file.truncate(0)
-logging.basicConfig(format='%(message)s', filename='main.log')
-
-##### Data Variables #####
-all_data: list[dict] = []
-exact_data: list[dict] = []
-mol: Molecule
-failed_mols: list[str] = []
-
-##### Input Structure Data Load #####
-STRUCTURES_CSV_FILE = csv.reader(open(STRUCTURES_PATH, "r+", encoding="UTF-8"))
-STRUCTURES = [(smiles,refcode) for (smiles,refcode) in STRUCTURES_CSV_FILE][1:]
-
-##### Structure Bar Status #####
-with tqdm(total=len(STRUCTURES)) as bar:
-
-    ##### SMILES Structure Loop #####
-    for (smiles, refcode) in STRUCTURES:
-
-        ##### Molecule Data #####
-        try:
-            mol = Molecule(smiles, name=refcode, type='mol')
-        except BaseException as exception:
-            failed_mols.append(smiles + " " + refcode)
-            print("  ", smiles, "Failed to be processed")
-            logging.error(f"{refcode} {smiles} Failed to be processed \n {traceback.format_exc()}")
-            continue
-
-        ##### All Functional Group Format Data #####
-        all_data.append({
-            "Refcode": mol.name,
-            "SMILES": smiles,
-            "Aromatic Rings": mol.aromatic_ring_count,
-            "Non Aromatic Rings": mol.non_aromatic_ring_count,
-            "Rings": mol.total_ring_count,
-            "AminoAcid": "Yes" if mol.amino_acid else "No",
-            **mol.functional_groups_all,
-        })
-
-        ##### Exact Functional Group Format Data #####
-        exact_data.append({
-            "Refcode": mol.name,
-            "SMILES": smiles,
-            "Aromatic Rings": mol.aromatic_ring_count,
-            "Non Aromatic Rings": mol.non_aromatic_ring_count,
-            "Rings": mol.total_ring_count,
-            "AminoAcid": "Yes" if mol.amino_acid else "No",
-            **mol.functional_groups_exact,
-        })
-
-        ##### Status Bar Update #####
-        bar.update(1)                                               # Increment the progress bar once smiles finishes processing
-
-##### Pandas Dataframe #####
-df_all = pandas.DataFrame(all_data).fillna(0).set_index("Refcode")
-df_exact = pandas.DataFrame(exact_data).fillna(0).set_index("Refcode")
-
-##### Excel Exporter (xlsx file type) #####
-writer = pandas.ExcelWriter(MAIN_OUTPUT_PATH)
-
-##### All Functional Groups Data Sheet Export #####
-df_all.to_excel(writer, sheet_name="all_data", freeze_panes=(1, 1))
-all_sheet = writer.sheets["all_data"]
-all_sheet.set_column(0, 0, 13)      # Refcode column width
-all_sheet.set_column(1, 1, 125)     # SMILES column width
-df_all_columns: list[str] = [str(col) for col in df_all.columns][1:]
-for i, col in enumerate(df_all_columns):
-    all_sheet.set_column(i+2, i+2, len(col)+7)
-
-##### Exact Functional Groups Data Sheet Export #####
-df_exact.to_excel(writer, sheet_name="exact_data", freeze_panes=(1, 1))
-exact_sheet = writer.sheets["exact_data"]
-exact_sheet.set_column(0, 0, 13)      # Refcode column width
-exact_sheet.set_column(1, 1, 125)     # SMILES column width
-df_exact_columns: list[str] = [str(col) for col in df_exact.columns][1:]
-for i, col in enumerate(df_exact_columns):
-    exact_sheet.set_column(i+2, i+2, len(col)+7)
-
-##### Excel File Save #####
-writer.close()
-
-##### Structure Error Result Logging #####
-if failed_mols:
-    logging.error("##### Failed SMILES codes #####")
-else:
-    logging.error("Last execution was successfull for all structures")
-for failed_mol in failed_mols:
-    logging.error(failed_mol)
+"""Excel file generated by this script (None skips the excel file, which is limited to 1,048,575 structures)"""
+
+##### Target Main Output CSV Files #####
+CSV_OUTPUT_PATHS = None
+"""All and exact functional group data csv files generated by this script, with one column per functional group of the template library (None skips the csv files)"""
+
+##### Batch Identification Worker Processes #####
+WORKERS = os.cpu_count() or 1
+"""Number of worker processes which identify structures in parallel (1 processes every structure serially in this process)"""
+
+##### Batch Identification Chunk Size #####
+CHUNK_SIZE = 16
+"""Number of (smiles, refcode) rows handed to a worker process at a time"""
+
+##### Target Main Output Columnar File #####
+COLUMNAR_OUTPUT_PATH = None
+"""Columnar binary (npz) file of the all and exact functional group data generated by this script, read back by analysis.py far faster than the excel file (None skips the columnar file)"""
+
+##### Streaming Window Size #####
+WINDOW_SIZE = 4096
+"""Number of (smiles, refcode) rows read, identified and written at a time, which bounds the memory used by the script"""
+
+##### Requested Functional Groups #####
+FUNCTIONAL_GROUPS = None
+"""Functional group names of the template library to identify, such as ``["Alcohol", "Ketone"]``, which skips the templates that cannot affect their counts (None identifies every functional group)"""
+
+##### Persistent Result Cache #####
+CACHE_PATH = None
+"""SQLite file which caches the results of identified SMILES codes between runs (None disables the cache)"""
+
+##### Per-Molecule Work Budget #####
+MAX_SEARCH_STEPS = None
+"""Largest number of functional group search steps of a structure before it is logged as timed out with its stage (None for no step limit)"""
+
+MAX_SECONDS = None
+"""Largest wall time in seconds of a structure before it is logged as timed out with its stage, which bounds the time any one structure can stall the run (None for no time limit)"""
+
+##### Stage Profile Output #####
+PROFILE_OUTPUT_PATH = None
+"""JSON file of the per-stage wall time and search counter percentiles and slowest molecules of the identified structures (None disables the profiling)"""
+
+PROFILE_TOP = 10
+"""Number of slowest molecules listed per stage and counter in the profile JSON file"""
+
+
+##### Input Structure Stream Function #####
+def readStructures(path: str) -> "Iterator[tuple[str, str]]":
+    """Read the (smiles, refcode) rows of a SMILES codes csv file one at a time, without its header row"""
+
+    with open(path, encoding="UTF-8") as structures_file:
+        rows = csv.reader(structures_file)
+        next(rows, None)
+        for (smiles, refcode) in rows:
+            yield (smiles, refcode)
+
+
+##### Structure Identification Stream Function #####
+def identifyStructures(
+    structures: "Iterator[tuple[str, str]]",
+    pool: "BatchPool | None",
+    cache: "ResultCache | None",
+    summary: "ProfileSummary | None" = None,
+) -> "Iterator[tuple[str, str, dict | str]]":
+    """Identify a stream of (smiles, refcode) rows in windows of ``WINDOW_SIZE`` rows.
+
+        Yields the (smiles, refcode, result) of every row in input order, where the result is a result record
+        (see :py:meth:`molecule.MoleculeResult.asDict`) or the traceback of a failed structure (the budget message with the stage of a timed out structure). Each window is looked up in the cache,
+        its uncached rows are identified as one batch (see :py:func:`batch.identifyMolecules`) by the worker processes (or serially without a pool),
+        and its new results are cached before the next window is read. The stage profiles of the identified rows (and the number of cached rows) are added to the ``summary`` when given.
+    """
+
+    ##### Structure Window Loop #####
+    while window := list(itertools.islice(structures, WINDOW_SIZE)):
+
+        ##### Cached Structure Results #####
+        cached_results: dict[str, dict] = cache.getMany(smiles for (smiles, _) in window) if cache else {}
+        new_structures = [(smiles, refcode) for (smiles, refcode) in window if smiles not in cached_results]
+        new_results: list[tuple[str, dict]] = []
+
+        ##### Input Ordered Uncached Structure Results #####
+        batch = identifyMolecules(
+            new_structures,
+            FUNCTIONAL_GROUPS,
+            chunk_size=CHUNK_SIZE,
+            pool=pool,
+            profile=summary is not None,
+            max_steps=MAX_SEARCH_STEPS,
+            max_seconds=MAX_SECONDS,
+        )
+        if summary is not None:
+            for name, profile in zip(batch.names, batch.profiles):
+                if profile:
+                    summary.add(name, profile)
+        results = (batch.errors[i] if i in batch.errors else batch.result(i).asDict() for i in range(len(batch)))
+
+        ##### Window Structure Loop #####
+        for (smiles, refcode) in window:
+            if smiles in cached_results:
+                result = cached_results[smiles]
+                if summary is not None:
+                    summary.addCached(1)
+            else:
+                result = next(results)
+                if not isinstance(result, str):
+                    new_results.append((smiles, result))
+            yield (smiles, refcode, result)
+
+        ##### New Structure Results Cache #####
+        if cache:
+            cache.putMany(new_results)
+
+
+##### Structure Data Rows Function #####
+def structureRows(smiles: str, refcode: str, result: dict) -> "tuple[dict, dict]":
+    """Creates the all and exact functional group format data rows of a structure from its result record"""
+
+    ##### Ring & Amino Acid Data #####
+    structure_row = {
+        "Refcode": refcode,
+        "SMILES": smiles,
+        "Aromatic Rings": result["aromatic_ring_count"],
+        "Non Aromatic Rings": result["non_aromatic_ring_count"],
+        "Rings": result["total_ring_count"],
+        "AminoAcid": "Yes" if result["amino_acid"] else "No",
+    }
+
+    ##### All & Exact Functional Group Format Data #####
+    return ({**structure_row, **result["functional_groups_all"]}, {**structure_row, **result["functional_groups_exact"]})
+
+
+if __name__ == "__main__":
+
+    ##### Failed Structure Logging Setup #####
+    with open("main.log", mode="w", encoding="UTF-8") as file:
+        file.truncate(0)
+    logging.basicConfig(format='%(message)s', filename='main.log')
+
+    ##### Data Variables #####
+    failed_mols: list[str] = []
+    structure_count: int = 0
+    skipped_templates: int = 0
+
+    ##### Input Structure Count #####
+    with open(STRUCTURES_PATH, encoding="UTF-8") as structures_file:
+        total_structures = max(sum(1 for _ in structures_file) - 1, 0)
+
+    ##### Functional Group Columns #####
+    library = loadFunctionalGroupLibrary()
+    fg_columns = library.groupColumns(FUNCTIONAL_GROUPS)
+
+    ##### Output Sinks #####
+    sinks: list[Sink] = []
+    if MAIN_OUTPUT_PATH:
+        sinks.append(ExcelSink(MAIN_OUTPUT_PATH))
+    if CSV_OUTPUT_PATHS:
+        sinks.append(CsvSink(*CSV_OUTPUT_PATHS, fg_columns))
+    if COLUMNAR_OUTPUT_PATH:
+        sinks.append(ColumnarSink(COLUMNAR_OUTPUT_PATH, fg_columns))
+
+    ##### Stage Profile Summary #####
+    summary = ProfileSummary(PROFILE_TOP) if PROFILE_OUTPUT_PATH else None
+
+    ##### Structure Bar Status, Worker Process Pool, Result Cache & Output Sinks #####
+    with (
+        tqdm(total=total_structures) as bar,
+        batchPool(WORKERS, FUNCTIONAL_GROUPS, profile=summary is not None, max_steps=MAX_SEARCH_STEPS, max_seconds=MAX_SECONDS) if WORKERS > 1 else contextlib.nullcontext() as pool,
+        ResultCache(CACHE_PATH, groups=FUNCTIONAL_GROUPS) if CACHE_PATH else contextlib.nullcontext() as cache,
+        contextlib.ExitStack() as sink_stack,
+    ):
+        for sink in sinks:
+            sink_stack.enter_context(sink)
+
+        ##### SMILES Structure Stream Loop (read -> identify -> write) #####
+        for (smiles, refcode, result) in identifyStructures(readStructures(STRUCTURES_PATH), pool, cache, summary):
+
+            ##### Failed Structure Case #####
+            if isinstance(result, str):
+                failed_mols.append(smiles + " " + refcode)
+                print("  ", smiles, "Failed to be processed")
+                logging.error(f"{refcode} {smiles} Failed to be processed \n {result}")
+                continue
+
+            ##### All & Exact Functional Group Format Data Output #####
+            all_row, exact_row = structureRows(smiles, refcode, result)
+            for sink in sinks:
+                sink.write(all_row, exact_row)
+            structure_count += 1
+            skipped_templates += result["skipped_template_count"]
+
+            ##### Status Bar Update #####
+            bar.update(1)                                               # Increment the progress bar once smiles finishes processing
+
+    ##### Template Screen Skip Rate #####
+    template_searches = (sum(library.closure(FUNCTIONAL_GROUPS)) if FUNCTIONAL_GROUPS is not None else len(library))*structure_count
+    skip_rate = f"Template screen skipped {skipped_templates} of {template_searches} template searches ({skipped_templates/max(template_searches, 1):.1%})"
+    print(skip_rate)
+    logging.error(skip_rate)
+
+    ##### Stage Profile Output #####
+    if summary is not None:
+        summary.dump(PROFILE_OUTPUT_PATH)
+
+    ##### Structure Error Result Logging #####
+    if failed_mols:
+        logging.error("##### Failed SMILES codes #####")
+    else:
+        logging.error("Last execution was successfull for all structures")
+    for failed_mol in failed_mols:
+        logging.error(failed_mol)
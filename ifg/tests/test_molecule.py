@@ -1,6 +1,26 @@
 """Pytest file for ifg module testing"""
 
-from chem.molecule import Molecule
+from collections import Counter
+import math
+
+import numpy
+import openpyxl
+import pandas
+
+from chem.bandgaps import bandgapBinCounts, bandgapBins
+from chem.batch import batchPool, identifyMolecules
+from chem.budget import BudgetExceeded
+from chem.cache import ResultCache, moleculeResult
+from chem.columnar import ColumnarSink, readColumnar
+from chem.constants import RING_NOMENCLATURE
+from chem.counts import CountMatrix
+from chem.molecule import FunctionalGroupMatch, Molecule
+from chem.profiling import COUNTERS, STAGES, LogHistogram, ProfileSummary
+from chem.matching import MATCHERS
+from chem.sinks import CsvSink, ExcelSink
+from chem.templates import loadFunctionalGroupLibrary
+from chem.tokens import tokenize
+from chem.workloads import SERIES, aceneSmiles, peptideSmiles, polyesterSmiles, stressSmiles
 
 def test_mol():
     """Place a test molecule to view if the output works"""
@@ -9,3 +29,416 @@ def test_mol():
 def test_fg():
     """Place a test functional group to view if the output works"""
     assert Molecule("[R]C(=O)[R]", name="Ketone", type="fg")
+
+def test_fg_library_compiled_once(tmp_path):
+    """The functional group library is shared until its csv file changes"""
+    library_path = tmp_path / "functional_group_smiles_codes.csv"
+    library_path.write_text("[R]C(=O)[R], Ketone\n")
+    library = loadFunctionalGroupLibrary(str(library_path))
+    assert loadFunctionalGroupLibrary(str(library_path)) is library
+    assert [template.name for template in library] == ["Ketone"]
+
+    library_path.write_text("[R]C(=O)[R], Ketone\n[R]C(=O)O[R], Ester\n")
+    assert [template.name for template in loadFunctionalGroupLibrary(str(library_path))] == ["Ketone", "Ester"]
+
+def test_adjacency():
+    """Every edge is indexed under both of its vertices and sets their degrees"""
+    mol = Molecule("CC(=O)Oc1ccccc1", name="AXUDIH", type="mol")
+    assert sum(len(incident_edges) for incident_edges in mol.adjacency) == 2*mol.size
+    assert [edge.complement_vertex(1).index for edge in mol.adjacency[1]] == [0, 2, 3]
+    assert [(vertex.explicit_degree, vertex.implicit_degree) for vertex in mol.vertices[:4]] == [(1, 3), (3, 0), (1, 0), (2, 0)]
+
+def test_compact_graph():
+    """Vertices and edges are slot-based objects with tuple views of their atoms"""
+    mol = Molecule("O=C1NCCCN1", name="APYFEB01", type="mol")
+    assert not hasattr(mol.vertices[0], "__dict__") and not hasattr(mol.edges[0], "__dict__")
+    assert mol.edges[0].indices == (0, 1) and mol.edges[0].symbols == ('O', 'C') and mol.edges[0].bond_type == "="
+
+def test_tokenize():
+    """The SMILES code is classified into typed tokens once for every graph-building stage"""
+    tokens = tokenize("Cl[N+]1CC1=O")
+    assert [token.kind for token in tokens] == ["atom", "atom", "digit", "atom", "atom", "digit", "bond", "atom"]
+    assert [token.atom_index for token in tokens] == [0, 1, 1, 2, 3, 3, 3, 4]
+    assert Molecule("Cl[N+]1CC1=O", type="fg").atoms == ["Cl", "N+", "C", "C", "O"]
+
+def test_graph_ring_perception():
+    """The graph ring perception agrees with the SMILES code ring identifier algorithm"""
+    for smiles in ["O=C1NC2C(N(CN2N(=O)=O)N(=O)=O)N1N(=O)=O", "CC(=O)Oc1ccccc1", "c1ccc2c(c1)cccc2C#Cc1ccccc1C#Cc1cccc2ccccc12", "C1CCC2(CC1)CCC1(CC2)CCCCC1"]:
+        smiles_mol = Molecule(smiles, type="fg", ring_perception="smiles")
+        graph_mol = Molecule(smiles, type="fg", ring_perception="graph")
+        assert smiles_mol.ring_atoms == graph_mol.ring_atoms
+        assert (smiles_mol.aromatic_ring_count, smiles_mol.non_aromatic_ring_count) == (graph_mol.aromatic_ring_count, graph_mol.non_aromatic_ring_count)
+        assert [vertex.ring_type for vertex in smiles_mol.vertices] == [vertex.ring_type for vertex in graph_mol.vertices]
+
+def test_graph_ring_perception_aromatic_split():
+    """Fused rings with non-aromatic atoms written inside a later ring are counted aromatic only by the SMILES code ring identifier algorithm"""
+    smiles_mol = Molecule("c1ccc2c(c3ccc4c5c(Cc4c3C2)cccc5)c1", ring_perception="smiles")
+    graph_mol = Molecule("c1ccc2c(c3ccc4c5c(Cc4c3C2)cccc5)c1", ring_perception="graph")
+    assert (smiles_mol.aromatic_ring_count, smiles_mol.non_aromatic_ring_count) == (4, 1)
+    assert (graph_mol.aromatic_ring_count, graph_mol.non_aromatic_ring_count) == (3, 2)
+    assert smiles_mol.ring_atoms == graph_mol.ring_atoms and [vertex.ring_type for vertex in smiles_mol.vertices] == [vertex.ring_type for vertex in graph_mol.vertices]
+
+def test_matchers():
+    """The iterative VF2-style matcher finds the same functional groups as the recursive depth first search"""
+    for smiles in ["CC(=O)Oc1ccccc1", "COC(OC)OC", "NC(Cc1ccccc1)C(=O)O", "O=C1NC2C(N(CN2N(=O)=O)N(=O)=O)N1N(=O)=O"]:
+        dfs_mol = Molecule(smiles, type="mol", matcher="dfs")
+        vf2_mol = Molecule(smiles, type="mol", matcher="vf2")
+        assert list(dfs_mol.functional_groups_all.items()) == list(vf2_mol.functional_groups_all.items())
+        assert list(dfs_mol.functional_groups_exact.items()) == list(vf2_mol.functional_groups_exact.items())
+
+def test_discrimination_tree():
+    """Templates sharing a start vertex star share its tree nodes, and pruned start pairs are never matched"""
+    library = loadFunctionalGroupLibrary()
+    carbonyl = library.start_tree.roots[("C", 3)]
+    assert len(carbonyl[0]) < sum(1 for template in library for vertex in template.graph.vertices if (vertex.symbol, vertex.total_degree) == ("C", 3))
+    mol = Molecule("CC(=O)Oc1ccccc1", type="mol")
+    start_pairs = library.start_tree.startPairs(MATCHERS["vf2"](mol))
+    names = [template.name for template, template_start_pairs in zip(library, start_pairs) if template_start_pairs]
+    assert "Ester" in names and "Alcohol" not in names and "Nitrile" not in names
+
+def test_template_screen():
+    """Templates needing atoms or bonds the molecule lacks are skipped before any graph search"""
+    mol = Molecule("CC(=O)Oc1ccccc1", type="mol")
+    assert "Sulfone" in mol.skipped_templates and "Nitrile" in mol.skipped_templates
+    assert "Ester" not in mol.skipped_templates and mol.functional_groups_all["Ester"] == 1
+
+def test_result_cache(tmp_path):
+    """Cached results are reused until the functional group csv file changes"""
+    library_path = tmp_path / "functional_group_smiles_codes.csv"
+    library_path.write_text("[R]C(=O)[R], Ketone\n")
+    result = moleculeResult(Molecule("CC(=O)Oc1ccccc1", type="mol"))
+    with ResultCache(str(tmp_path / "results.sqlite"), str(library_path)) as cache:
+        cache.putMany([("CC(=O)Oc1ccccc1", result)])
+    with ResultCache(str(tmp_path / "results.sqlite"), str(library_path)) as cache:
+        cached = cache.getMany(["CC(=O)Oc1ccccc1", "CCO"])
+        assert list(cached) == ["CC(=O)Oc1ccccc1"] and cached["CC(=O)Oc1ccccc1"] == result
+        assert list(cached["CC(=O)Oc1ccccc1"]["functional_groups_all"]) == list(result["functional_groups_all"])
+
+    library_path.write_text("[R]C(=O)[R], Ketone\n[R]C(=O)O[R], Ester\n")
+    with ResultCache(str(tmp_path / "results.sqlite"), str(library_path)) as cache:
+        assert cache.getMany(["CC(=O)Oc1ccccc1"]) == {}
+
+def test_result_cache_group_selections(tmp_path):
+    """Runs alternating between functional group selections keep the cached results of every selection"""
+    smiles, path = "CC(=O)Oc1ccccc1", str(tmp_path / "results.sqlite")
+    results = {groups: moleculeResult(Molecule(smiles, groups=groups)) for groups in (("Ester",), ("Ketone", "Alcohol"), None)}
+    for groups, result in results.items():
+        with ResultCache(path, groups=groups) as cache:
+            assert cache.getMany([smiles]) == {}
+            cache.putMany([(smiles, result)])
+    for _ in range(2):
+        for groups, result in results.items():
+            with ResultCache(path, groups=groups) as cache:
+                assert cache.getMany([smiles]) == {smiles: result}
+
+def test_sinks(tmp_path):
+    """Rows streamed into the csv and excel sinks keep their input order and fill missing counts with 0"""
+    columns = loadFunctionalGroupLibrary().columns
+    rows = [
+        {"Refcode": "A", "SMILES": "CCO", "Aromatic Rings": 0, "Non Aromatic Rings": 0, "Rings": 0, "AminoAcid": "No", "Alcohol": 1},
+        {"Refcode": "B", "SMILES": "CC=O", "Aromatic Rings": 0, "Non Aromatic Rings": 0, "Rings": 0, "AminoAcid": "No", "Aldehyde": 1},
+    ]
+    with CsvSink(str(tmp_path / "all.csv"), str(tmp_path / "exact.csv"), columns) as csv_sink, ExcelSink(str(tmp_path / "out.xlsx")) as excel_sink:
+        for row in rows:
+            csv_sink.write(row, row)
+            excel_sink.write(row, row)
+    lines = (tmp_path / "all.csv").read_text().splitlines()
+    assert lines[0].split(",")[6:] == list(columns) and len(lines) == 3
+    sheet = openpyxl.load_workbook(tmp_path / "out.xlsx")["exact_data"]
+    assert [[cell.value for cell in row] for row in sheet.iter_rows(min_col=1, max_col=1)] == [["Refcode"], ["A"], ["B"]]
+    assert [cell.value for cell in sheet[1]][6:] == ["Alcohol", "Aldehyde"] and [cell.value for cell in sheet[3]][6:] == [0, 1]
+
+def test_columnar(tmp_path):
+    """Tables written to a columnar file read back with the excel sheet columns, in their first-seen order"""
+    columns = loadFunctionalGroupLibrary().columns
+    rows = [
+        {"Refcode": "A", "SMILES": "CCO", "Aromatic Rings": 0, "Non Aromatic Rings": 0, "Rings": 0, "AminoAcid": "No", "Alcohol": 1},
+        {"Refcode": "B", "SMILES": "O=Cc1ccccc1", "Aromatic Rings": 1, "Non Aromatic Rings": 0, "Rings": 1, "AminoAcid": "Yes", "Aromatic Aldehyde": 1},
+    ]
+    with ColumnarSink(str(tmp_path / "out.npz"), columns) as sink:
+        for row in rows:
+            sink.write(row, {**row, "Alcohol": 0})
+    all_data = readColumnar(str(tmp_path / "out.npz"), "all_data")
+    assert all_data.to_dict("records") == [{"Alcohol": 0, "Aromatic Aldehyde": 0, **rows[0]}, {"Alcohol": 0, "Aromatic Aldehyde": 0, **rows[1]}]
+    assert list(readColumnar(str(tmp_path / "out.npz"), "exact_data").columns)[6:] == ["Aromatic Aldehyde"]
+    assert len(readColumnar(str(tmp_path / "out.npz"), "exact_data", drop_zero_columns=False).columns) == 6 + len(columns)
+    with ColumnarSink(str(tmp_path / "reversed.npz"), columns) as sink:
+        for row in reversed(rows):
+            sink.write(row, row)
+    assert list(readColumnar(str(tmp_path / "reversed.npz"), "all_data").columns)[6:] == ["Aromatic Aldehyde", "Alcohol"]
+    assert list(readColumnar(str(tmp_path / "reversed.npz"), "all_data", drop_zero_columns=False).columns)[6:8] == ["Aromatic Aldehyde", "Alcohol"]
+
+def test_count_matrix():
+    """Sparse count matrices store only non-zero counts and convert to dense arrays and dataframes"""
+    columns = loadFunctionalGroupLibrary().columns
+    mols = [Molecule(smiles, type="mol") for smiles in ["CC(=O)Oc1ccccc1", "CCO", "C"]]
+    matrix = CountMatrix.fromDicts([mol.functional_groups_exact for mol in mols], columns)
+    assert matrix.shape == (3, len(columns)) and matrix.nnz == sum(len(mol.functional_groups_exact) for mol in mols)
+    assert [matrix.row(i) for i in range(3)] == [dict(mol.functional_groups_exact) for mol in mols]
+    assert matrix.column("Alcohol").tolist() == [0, 1, 0] and matrix.toarray().sum() == matrix.data.sum()
+    assert list(matrix.toDataFrame(drop_zero_columns=True).columns) == [col for col in columns if col in {**mols[0].functional_groups_exact, **mols[1].functional_groups_exact}]
+    stacked = CountMatrix.concatenate([matrix, matrix], columns)
+    assert stacked.shape == (6, len(columns)) and (stacked.toarray() == numpy.vstack([matrix.toarray()]*2)).all()
+
+def test_lazy_properties():
+    """Ring data and functional groups are computed on first access, and results keep only the final numbers"""
+    mol = Molecule("CC(=O)Oc1ccccc1", name="AXUDIH", type="mol")
+    assert "ring_data" not in mol.__dict__ and "functional_groups" not in mol.__dict__
+    assert mol.atom_freq["O"] == 2 and mol.total_ring_count == 1
+    assert "ring_data" in mol.__dict__ and "functional_groups" not in mol.__dict__
+    result = mol.result()
+    assert not hasattr(result, "__dict__") and result.name == "AXUDIH" and result.functional_groups_exact == {"Ester": 1}
+    assert result.asDict()["total_ring_count"] == 1 and result.skipped_template_count == len(mol.skipped_templates)
+
+
+def test_functional_group_subset():
+    """A functional group subset gives the same counts as the full identification, restricted to its columns"""
+    library = loadFunctionalGroupLibrary()
+    needed = library.closure(["Ketone"])
+    names = [template.name for template, needed_template in zip(library, needed) if needed_template]
+    assert "Ketone" in names and "Ester" in names and "Nitrile" not in names
+    for smiles in ["CC(=O)OC", "CC(=O)C", "CC(=O)Oc1ccc(cc1)C(C)=O", "N#CCC(C)=O"]:
+        full, subset = Molecule(smiles), Molecule(smiles, groups=["Ketone"])
+        columns = library.groupColumns(["Ketone"])
+        assert dict(subset.functional_groups_all) == {col: count for col, count in full.functional_groups_all.items() if col in columns}
+        assert dict(subset.functional_groups_exact) == {col: count for col, count in full.functional_groups_exact.items() if col in columns}
+
+
+def test_batch_identification():
+    """A batch gives the same results as identifying each molecule on its own, and records failed structures"""
+    structures = [("CC(=O)OC", "A"), ("c1ccccc1O", "B"), ("C1CC", "C"), ("NCC(=O)O", "D")]
+    for workers in (1, 2):
+        batch = identifyMolecules(structures, workers=workers, chunk_size=1)
+        assert len(batch) == 4 and list(batch.errors) == [2] and batch.result(2) is None
+        assert batch.functional_groups_exact.shape == (4, len(loadFunctionalGroupLibrary().columns))
+        for i, (smiles, name) in enumerate(structures):
+            if i != 2:
+                assert batch.result(i).asDict() == moleculeResult(Molecule(smiles, name=name, type="mol"))
+        assert batch.amino_acids.tolist() == [False]*4 and batch.total_ring_counts.tolist() == [0, 1, 0, 0]
+
+
+def test_stage_profile():
+    """Profiled molecules record every stage and search counter, and summaries rank the slowest molecules"""
+    assert Molecule("CCO").profile is None and Molecule("CCO").result().profile is None
+    summary = ProfileSummary(top=2)
+    for i, smiles in enumerate(["CC(=O)Oc1ccc(cc1)C(C)=O", "CCO", "CC(=O)OC"]):
+        profile = Molecule(smiles, name=str(i), profile=True).result().profile
+        assert list(profile["seconds"]) == list(STAGES) and list(profile["counters"]) == list(COUNTERS)
+        assert profile["counters"]["matches"] >= profile["counters"]["hierarchy_filtered"] + profile["counters"]["overlap_filtered"]
+        summary.add(str(i), profile)
+    result = summary.summary()
+    assert result["molecules"] == 3 and len(result["seconds"]["total"]["top"]) == 2
+    assert result["counters"]["overlap_filtered"]["max"] == 2 and result["counters"]["dfs_calls"]["top"][0]["name"] == "0"
+    summary.addCached(5)
+    assert summary.summary()["cached_molecules"] == 5
+
+
+def test_profile_histogram():
+    """Streaming histogram percentiles stay within 1% of the exact percentiles with a bounded number of buckets"""
+    values = [0.0]*100 + [1e-6*1.001**i for i in range(5000)]
+    histogram = LogHistogram()
+    for value in values:
+        histogram.add(value)
+    assert histogram.count == len(values) and histogram.maximum == max(values) and abs(histogram.total - sum(values)) < 1e-9
+    for q in (0, 50, 90, 99, 100):
+        exact = sorted(values)[math.ceil((len(values) - 1)*q/100)]
+        assert abs(histogram.percentile(q) - exact) <= 0.01*exact
+    assert len(histogram.buckets) < 300
+
+
+def test_scaling_series():
+    """The generated scaling series molecules have the expected sizes, rings and functional groups"""
+    assert Molecule(aceneSmiles(12)).aromatic_ring_count == 12 and Molecule(aceneSmiles(12)).order == 4*12+2
+    assert Molecule(polyesterSmiles(5)).functional_groups_exact == {"Ester": 5}
+    assert Molecule(peptideSmiles(4)).functional_groups_exact["Amide"] == 3
+    assert all(Molecule(generator(8)).order >= 8 for generator in SERIES.values())
+
+
+def test_large_molecules():
+    """Molecules of 10,000 heavy atoms are identified without recursion limits and with search work linear in their size"""
+    small, large = Molecule(stressSmiles(2500), profile=True), Molecule(stressSmiles(10000), profile=True)
+    assert large.order == 10000 and large.functional_groups_exact == {name: 4*count for name, count in small.functional_groups_exact.items()}
+    assert large.profile.counters["search_states"] == 4*small.profile.counters["search_states"]
+    graph = Molecule(stressSmiles(10000), ring_perception="graph", matcher="dfs")
+    assert graph.aromatic_ring_count == large.aromatic_ring_count == 500 and graph.functional_groups_exact == large.functional_groups_exact
+    assert Molecule(aceneSmiles(2500)).aromatic_ring_count == 2500
+
+
+def test_work_budget():
+    """A molecule exceeding its search step budget times out in the match stage, while the rest of its batch is identified"""
+    try:
+        Molecule(stressSmiles(2000), max_steps=100).functional_groups
+    except BudgetExceeded as exceeded:
+        assert exceeded.stage == "match" and exceeded.steps == 101
+    else:
+        assert False
+    dfs_mol = Molecule("CC(=O)OC", matcher="dfs", groups=["Ester"], max_steps=3)
+    try:
+        dfs_mol.functional_groups
+    except BudgetExceeded as exceeded:
+        assert exceeded.stage == "match" and exceeded.steps == 4
+    else:
+        assert False
+    filtered_mol = Molecule("CC(=O)OC", max_seconds=60)
+    filtered_mol.budget.max_seconds = 0
+    try:
+        filtered_mol.overlapFilter([FunctionalGroupMatch(0, "Ester", ((0, 0),), "non-cyclic", frozenset({0}), frozenset())])
+    except BudgetExceeded as exceeded:
+        assert exceeded.stage == "overlapFilter"
+    else:
+        assert False
+    batch = identifyMolecules([("CC(=O)OC", "ester"), (stressSmiles(2000), "large"), ("CCO", "ethanol")], max_steps=100, max_seconds=60)
+    assert batch.timeouts == {1: "match"} and batch.errors[1].startswith("Timed out in stage match")
+    assert batch.result(0).functional_groups_exact == {"Ester": 1} and batch.result(2).functional_groups_exact == {"Alcohol": 1}
+
+
+def test_batch_pool_settings():
+    """A reused worker pool identifies batches with its own settings and rejects batches asking for other settings"""
+    structures = [("CC(=O)OC", "ester"), ("CCO", "ethanol")]*20
+    with batchPool(2, ["Ester"]) as pool:
+        batch = identifyMolecules(structures, ["Ester"], chunk_size=4, pool=pool)
+        assert batch.functional_groups_exact.columns == loadFunctionalGroupLibrary().groupColumns(["Ester"])
+        assert batch.result(0).functional_groups_exact == {"Ester": 1} and batch.result(1).functional_groups_exact == {}
+        for settings in ({"groups": ["Alcohol"]}, {"groups": None}, {"groups": ["Ester"], "matcher": "dfs"}):
+            try:
+                identifyMolecules(structures, pool=pool, **settings)
+            except ValueError:
+                pass
+            else:
+                assert False
+
+
+FILTER_SMILES = [peptideSmiles(40), polyesterSmiles(40), stressSmiles(400), "CC(=O)NCC(=O)OCC(O)CN(C)C(=O)C", "NC(Cc1ccccc1)C(=O)O"]
+"""Synthetic molecules with many overlapping functional group matches, checked against the reference implementations of the match filters"""
+
+def _filterInputs(mol):
+    """Identifies a molecule and returns the matches given to its hierarchy filter and to its overlap filter"""
+    inputs = []
+    hierarchy_filter, overlap_filter = mol.hierarchyFilter, mol.overlapFilter
+    mol.hierarchyFilter = lambda all_fgs: inputs.append(all_fgs) or hierarchy_filter(all_fgs)
+    mol.overlapFilter = lambda all_fgs: inputs.append(all_fgs) or overlap_filter(all_fgs)
+    mol.functional_groups
+    return inputs[0], inputs[1]
+
+def _pairwiseHierarchyFilter(mol, all_fgs):
+    """The original pairwise hierarchy filter, comparing the non-R template edges and core vertices of every pair of matches"""
+    library = loadFunctionalGroupLibrary()
+    edges = [set(edge for edge in library.templates[fg.template].graph.edges if 'R' not in edge.symbols) for fg in all_fgs]
+    eval_indices = {i for i in range(len(all_fgs)) for j in range(len(all_fgs)) if i != j and edges[i] == edges[j] and all_fgs[i].core == all_fgs[j].core}
+    skip_indices = set()
+    for i in eval_indices:
+        fg_vertices = library.templates[all_fgs[i].template].graph.vertices
+        if any(
+            fg_vertices[fg_atom_index].explicit_degree != mol.vertices[om_atom_index].explicit_degree
+            or fg_vertices[fg_atom_index].implicit_degree != mol.vertices[om_atom_index].implicit_degree
+            for fg_atom_index, om_atom_index in all_fgs[i].atoms
+        ):
+            skip_indices.add(i)
+    return [fg for i, fg in enumerate(all_fgs) if i not in skip_indices]
+
+def test_hierarchy_filter_reference():
+    """The core signature hierarchy filter keeps the same matches as the pairwise filter, including when several hierarchy members share a core"""
+    for smiles in FILTER_SMILES:
+        mol = Molecule(smiles)
+        all_fgs, _ = _filterInputs(mol)
+        assert mol.hierarchyFilter(all_fgs) == _pairwiseHierarchyFilter(mol, all_fgs)
+    mol = Molecule(peptideSmiles(40))
+    all_fgs, filtered_fgs = _filterInputs(mol)
+    library = loadFunctionalGroupLibrary()
+    shared_core = [{library.templates[fg.template].name for fg in all_fgs if fg.core_signature == signature} for signature in {fg.core_signature for fg in all_fgs}]
+    assert {"PrimaryAmine", "SecondaryAmine", "TertiaryAmine"} in shared_core and {"Ester", "CarboxylicAcid"} in shared_core
+    assert len(filtered_fgs) < len(all_fgs)
+
+def _pairwiseOverlapFilter(all_fgs):
+    """The original pairwise overlap filter, removing every match whose core is a subset of a larger match core"""
+    return [fg for fg in all_fgs if not any(len(fg.core) < len(fg_compare.core) and fg.core <= fg_compare.core for fg_compare in all_fgs)]
+
+def test_overlap_filter_reference():
+    """The core vertex indexed overlap filter keeps the same matches as the pairwise filter"""
+    for smiles in FILTER_SMILES:
+        mol = Molecule(smiles)
+        _, all_fgs = _filterInputs(mol)
+        exact_fgs = mol.overlapFilter(all_fgs)
+        assert exact_fgs == _pairwiseOverlapFilter(all_fgs)
+        assert len(exact_fgs) < len(all_fgs)
+    equal_cores = [FunctionalGroupMatch(0, "A", (), "non-cyclic", frozenset({0, 1}), frozenset()), FunctionalGroupMatch(1, "B", (), "non-cyclic", frozenset({0, 1}), frozenset())]
+    assert Molecule("CC").overlapFilter(equal_cores) == _pairwiseOverlapFilter(equal_cores) == equal_cores
+
+def _listDedupeMatches(mol, matcher_name):
+    """The original match search of every template, which skips a duplicate match by comparing its vertex set with each earlier match"""
+    library = loadFunctionalGroupLibrary()
+    matcher = MATCHERS[matcher_name](mol)
+    screened = [template.screen(mol.atom_freq, mol.bond_freq) for template in library]
+    matches, duplicates = [], 0
+    for template_position, (template, passed, fg_start_pairs) in enumerate(zip(library, screened, library.startTree(None).startPairs(matcher, screened))):
+        if not passed:
+            continue
+        fg = template.graph
+        fg_core_size = len([vertex for vertex in fg.vertices if vertex.symbol != 'R'])
+        fg_matches = []
+        for fg_vertex_index, mol_vertex in fg_start_pairs:
+            fg_matched_atoms = matcher.match(fg, fg.vertices[fg_vertex_index], mol_vertex)
+            if len(fg_matched_atoms) == fg_core_size:
+                if set(fg_matched_atoms.values()) not in [set(m.values()) for m in fg_matches]:
+                    fg_matches.append(fg_matched_atoms)
+                else:
+                    duplicates += 1
+        matches += [(template_position, fg_matched_atoms) for fg_matched_atoms in fg_matches]
+    return matches, duplicates
+
+def test_match_dedupe_reference():
+    """The vertex set keyed duplicate match check keeps the same matches, in the same order, as the list comparison"""
+    for matcher_name in MATCHERS:
+        for smiles in FILTER_SMILES:
+            mol = Molecule(smiles, matcher=matcher_name)
+            all_fgs, _ = _filterInputs(mol)
+            matches, duplicates = _listDedupeMatches(Molecule(smiles, matcher=matcher_name), matcher_name)
+            assert [(fg.template, dict(fg.atoms)) for fg in all_fgs] == matches
+            assert duplicates > 0
+
+def test_match_records_reference():
+    """The match records carry the ring-classified names, cores and core edges of the matches, and give the same counts as the original filters"""
+    library = loadFunctionalGroupLibrary()
+    for smiles in FILTER_SMILES + ["c1ccncc1", "O=c1ccoc2ccccc12", "c1ccc2c(c1)C(=O)OC2=O"]:
+        mol = Molecule(smiles)
+        all_fgs, _ = _filterInputs(mol)
+        for fg, (template_position, fg_matched_atoms) in zip(all_fgs, _listDedupeMatches(Molecule(smiles), "vf2")[0]):
+            ring_types = [mol.vertices[om_atom_index].ring_type for om_atom_index in fg_matched_atoms.values()]
+            ring_type = "non-cyclic" if ring_types.count("aromatic") == ring_types.count("non-aromatic") == 0 else "aromatic" if ring_types.count("aromatic") >= ring_types.count("non-aromatic") else "non-aromatic"
+            assert fg.ring_type == ring_type and fg.name == RING_NOMENCLATURE[ring_type] + library.templates[template_position].name
+            assert fg.core == frozenset(fg_matched_atoms.values()) and fg.core_edges == library.templates[template_position].core_edges
+        reference_fgs = _pairwiseHierarchyFilter(mol, all_fgs)
+        assert mol.functional_groups_all == Counter(fg.name for fg in reference_fgs)
+        assert mol.functional_groups_exact == Counter(fg.name for fg in _pairwiseOverlapFilter(reference_fgs))
+
+
+def _loopBinCounts(bandgap_fg_data, bandgap_bins, bin_width):
+    """The original bandgap bin counting, filtering the structures of each bin and then the structures with each column present"""
+    bandgap_range_sorted_molecule_dataframes = [
+        bandgap_fg_data.loc[(bandgap_fg_data["bandgap"] >= bandgap) & (bandgap_fg_data["bandgap"] < bandgap+bin_width)]
+        for bandgap in bandgap_bins
+    ]
+    return [
+        [len(bandgap_molecules_subtable.loc[bandgap_molecules_subtable[f] > 0]) for f in bandgap_fg_data.columns]
+        for bandgap_molecules_subtable in bandgap_range_sorted_molecule_dataframes
+    ]
+
+def test_bandgap_bin_counts():
+    """Bandgap bin counts match the original per bin filtering loop, including bandgaps on bin edges and at the largest bandgap"""
+    rng = numpy.random.default_rng(0)
+    bandgaps = [*numpy.round(rng.uniform(0, 4.6, 500), 2), 0.0, 0.5, 1.0, 1.25, 2.75, 4.5, 4.6]
+    bandgap_fg_data = pandas.DataFrame({fg: rng.integers(0, 3, len(bandgaps)) for fg in ("Alcohol", "Ester", "Ketone")}, index=[f"S{i}" for i in range(len(bandgaps))])
+    bandgap_fg_data["bandgap"] = bandgaps
+    for bin_width in (0.5, 0.25):
+        bandgap_bins = bandgapBins(max(bandgaps), bin_width)
+        assert bandgap_bins == [x*bin_width for x in range(0, math.ceil(math.ceil(max(bandgaps))/bin_width))]
+        counts = bandgapBinCounts(bandgap_fg_data["bandgap"], bandgap_fg_data > 0, bandgap_bins, bin_width)
+        assert list(counts.index) == bandgap_bins and list(counts.columns) == list(bandgap_fg_data.columns)
+        assert counts.values.tolist() == _loopBinCounts(bandgap_fg_data, bandgap_bins, bin_width)
+        assert bandgapBinCounts(bandgap_fg_data["bandgap"], bandgap_fg_data.notna(), bandgap_bins, bin_width)["bandgap"].sum() == len(bandgaps)
+        assert counts.loc[4.5, "bandgap"] == len([bandgap for bandgap in bandgaps if 4.5 <= bandgap])
+    whole_max = pandas.DataFrame({"Alcohol": [1, 1], "bandgap": [0.5, 3.0]})
+    bandgap_bins = bandgapBins(3.0, 0.5)
+    counts = bandgapBinCounts(whole_max["bandgap"], whole_max > 0, bandgap_bins, 0.5)
+    assert bandgap_bins[-1] == 3.0 and counts.loc[3.0, "Alcohol"] == 1 and counts["Alcohol"].sum() == 2
+    assert counts.values.tolist()[:-1] == _loopBinCounts(whole_max, bandgap_bins[:-1], 0.5)